@@ -0,0 +1,192 @@
+# bowers_html.py
+# HTML ekstraktor Bowers & Wilkins stranice proizvoda (fallback kada SFCC JSON nije dostupan).
+# • Zaseban modul da bi ga proces parsera (parse_pool) i parity.py uvezli bez pokretanja
+#   skripte brenda
+# • extract_specifications(): jedan prolaz kroz svaki kontejner specifikacija
+
+import re
+from urllib.parse import urljoin
+
+from bs4 import CData, NavigableString, Tag
+
+from selector_registry import first
+
+# --- SPECIFIKACIJE (jedan prolaz kroz svaki kontejner) ---
+SPEC_CONTAINERS = (
+    'div.specifications-wrapper, div.specifications, div.product-specifications, table.spec-table, ul.specs-list, '
+    'div.tech-specifications, div.product-features, div.spec-group, dl.tech-specs-list, '
+    'div.pdp-specifications, div.tech-data-block'
+)
+# Redovi: li, tr, dt, dd i div sa jednom od klasa (ako ih nema – svi li/div/tr/dt/dd)
+ROW_TAGS = {'li', 'tr', 'dt', 'dd'}
+ROW_DIV_CLASSES = {'specs-item', 'feature-item', 'spec-row', 'tech-spec-row', 'spec-detail-item'}
+FALLBACK_ROW_TAGS = {'li', 'div', 'tr', 'dt', 'dd'}
+# Uloge potomaka reda: par span.name/span.value, ili opšti ključ/vrednost
+PAIR_KEY, PAIR_VALUE, KEY, VALUE = range(4)
+KEY_TAGS = {'th', 'strong', 'h3'}
+KEY_CLASSES = {'feature-title', 'spec-label', 'tech-spec-key', 'key-title'}
+VALUE_TAGS = {'td', 'p'}
+VALUE_CLASSES = {'feature-value', 'spec-value', 'tech-spec-value', 'value-text'}
+
+def parse_product_html(soup, product_url):
+    """HTML fallback za stranicu proizvoda – ista polja kao sfcc.product_fields()."""
+    product_title_tag = soup.find('h1', class_='product-name')
+    product_title = product_title_tag.text.strip() if product_title_tag else None
+
+    tagline_tag = soup.find('p', class_='product-tagline')
+    tagline = tagline_tag.text.strip() if tagline_tag else None
+
+    sku = None
+    sku_selectors = [
+        'div.product-model-number', 'div.product-meta-item:has(strong:-soup-contains("Model")) span.product-meta-value',
+        'span.model-number'
+    ]
+    sku_tag = first(soup, 'pid', sku_selectors)
+    if sku_tag:
+        sku = sku_tag.text.strip()
+    
+    description = None
+    description_selectors = [
+        'div.product-short-description', 'div.short-description p', 'div.product-description-container p',
+        'div.product-details-intro__description p', 'div.product-details__summary p',
+        'div.product-features-container .product-features-intro p', 'div[data-component-name="ProductShortDescription"] p'
+    ]
+    
+    description_tag = first(soup, 'description', description_selectors)
+    if description_tag:
+        description = description_tag.text.strip()
+    
+    price_text = None
+    price_selectors = ['div.price', 'span.price-new', 'span.product-price', 'div[data-price-value]', '.price-value']
+
+    price_tag = first(soup, 'price', price_selectors)
+    if price_tag:
+        if 'data-price-value' in price_tag.attrs:
+            price_text = price_tag['data-price-value']
+        else:
+            price_text = price_tag.get_text(strip=True)
+    
+    cena = price_text
+
+    image_urls = [urljoin(product_url, img.get('data-pswp-src'))
+                  for img in soup.select('div.pswp-gallery a[data-pswp-src]')]
+    
+    specifications = extract_specifications(soup)
+
+    available_colors = []
+    color_swatches = soup.select('span.color-swatch, .product-color-selector .color-item')
+    for swatch_span in color_swatches:
+        color_name_tag = swatch_span.select_one('.swatch-value')
+        color_image_tag = swatch_span.select_one('.swatch.color-value, .color-swatch-image')
+        
+        color_name = color_name_tag.text.strip() if color_name_tag else swatch_span.get('data-color-name')
+        color_url = None
+        
+        if color_image_tag and 'style' in color_image_tag.attrs:
+            style_attr = color_image_tag['style']
+            match = re.search(r'url\((.*?)\)', style_attr)
+            if match:
+                relative_url = match.group(1).replace('"', '').replace("'", '')
+                color_url = urljoin(product_url, relative_url)
+        
+        if color_name:
+            available_colors.append({"boja": color_name, "url_uzorka": color_url})
+
+    return {
+        "title": product_title,
+        "pid": sku,
+        "cena": cena,
+        "opis": description,
+        "tagline": tagline,
+        "images": image_urls,
+        "specs": specifications,
+        "category": None,
+        "colors": available_colors,
+        "available": None,
+    }
+
+def _spec_roles(tag):
+    """Skup uloga (PAIR_KEY, PAIR_VALUE, KEY, VALUE) koje tag ima kao potomak reda."""
+    name = tag.name
+    classes = set(tag.get('class') or ())
+    return (
+        (name == 'span' and 'name' in classes) or 'tech-spec-label' in classes,
+        (name == 'span' and 'value' in classes) or 'tech-spec-value' in classes,
+        name in KEY_TAGS or (name == 'div' and 'specs-item-title' in classes) or bool(classes & KEY_CLASSES),
+        name in VALUE_TAGS or (name == 'div' and 'specs-item-info' in classes) or bool(classes & VALUE_CLASSES),
+    )
+
+def _is_spec_row(tag):
+    return tag.name in ROW_TAGS or (tag.name == 'div' and not ROW_DIV_CLASSES.isdisjoint(tag.get('class') or ()))
+
+def _text_with_breaks(tag):
+    """get_text(' ', strip=True) u kome <br> postaje novi red – bez menjanja stabla."""
+    parts = []
+    for node in tag.descendants:
+        if isinstance(node, Tag):
+            if node.name == 'br':
+                parts.append('\n')
+        elif type(node) in (NavigableString, CData):
+            text = node.strip()
+            if text:
+                parts.append(text)
+    return ' '.join(parts).strip()
+
+def extract_specifications(soup):
+    """
+    Specifikacije iz svih SPEC_CONTAINERS u jednom prolazu po kontejneru: za svaki čvor se
+    unazad (deca pre roditelja) pamti prvi potomak u svakoj ulozi, pa red ne pretražuje svoje
+    podstablo ponovo. dt/dd, tabele i label/value redovi se obrađuju zajedno, a kontejner
+    unutar već obrađenog kontejnera se preskače.
+    """
+    specifications = {}
+    containers = soup.select(SPEC_CONTAINERS)
+    container_ids = {id(c) for c in containers}
+    covered = set()
+
+    for container in containers:
+        if id(container) in covered:
+            continue
+        nodes = [n for n in container.descendants if isinstance(n, Tag)]
+        covered.update(id(n) for n in nodes if id(n) in container_ids)
+
+        # first_by_role[id(čvor)] = prvi potomak (redosled dokumenta) za svaku ulogu
+        first_by_role = {}
+        for node in reversed(nodes):
+            found = [None, None, None, None]
+            for child in node.contents:
+                if not isinstance(child, Tag):
+                    continue
+                below = first_by_role[id(child)]
+                for role, has_role in enumerate(_spec_roles(child)):
+                    if found[role] is None:
+                        found[role] = child if has_role else below[role]
+            first_by_role[id(node)] = found
+
+        rows = [n for n in nodes if _is_spec_row(n)] or [n for n in nodes if n.name in FALLBACK_ROW_TAGS]
+        last_key = None
+        for row in rows:
+            key = value = None
+            found = first_by_role[id(row)]
+            if found[PAIR_KEY] and found[PAIR_VALUE]:
+                key = found[PAIR_KEY].text.strip()
+                value = _text_with_breaks(found[PAIR_VALUE])
+                last_key = key
+            elif row.name in ('li', 'div', 'tr'):
+                if found[KEY] and found[VALUE]:
+                    key = found[KEY].text.strip()
+                    value = found[VALUE].get_text(separator=' ', strip=True)
+                    last_key = key
+            elif row.name == 'dt':
+                last_key = row.get_text(strip=True)
+                continue
+            elif row.name == 'dd' and last_key:
+                key = last_key
+                value = row.get_text(separator=' ', strip=True)
+                last_key = None
+            else:
+                continue
+
+            if key and value and len(key) < 100:
+                specifications[key] = value
+    return specifications
@@ -0,0 +1,349 @@
+# catalog_store.py
+# Katalog proizvoda u SQLite bazi (WAL) umesto celog JSON niza u memoriji.
+# • Jedan red po proizvodu, ključ (brend, kanonski URL) – ponovo skrejpovan proizvod
+#   zamenjuje svoj red (upsert), nema duplikata kao kod spajanja existing_data + new_products
+# • Vremena promene po polju: field_times beleži kada se koje polje zapisa poslednji put
+#   promenilo, updated_at kada se promenio ceo zapis; nepromenjen zapis se ne upisuje
+# • Prvi run uvozi postojeći json/*.json brenda (import_json); JSON je posle toga izvoz
+#   (export_json) koji se piše red po red, bez učitavanja celog kataloga
+# • Skrejper drži samo skup URL-ova, a zapise čita po potrebi (get) ili u grupama (batches)
+# • Otisak zapisa (SHA-256 nad normalizovanim poljima) odlučuje da li je zapis promenjen –
+#   redosled ključeva i razmaci oko teksta nisu promena
+# • Izvoz ne dira JSON fajl kada je novi sadržaj bajt-identičan, a promene run-a (dodati,
+#   uklonjeni i izmenjeni zapisi sa razlikama po polju) piše u <izlaz>.changes.json
+# • prune(): proizvodi kojih više nema u listinzima / sitemap-u se brišu (i idu u
+#   "uklonjeni") – skrejper ga zove samo kada je otkrivanje proizvoda prošlo bez grešaka
+# • rewrite(func, containing=...): SQLite bira samo zapise čiji JSON sadrži dati tekst,
+#   pa se za migraciju ne čita ceo katalog
+
+import filecmp
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+DB_PATH = os.environ.get("SONUS_CATALOG_DB", "catalog.sqlite3")
+BATCH_SIZE = 200
+URL_FIELD = "url_proizvoda"
+CHANGES_SUFFIX = ".changes.json"
+PRUNE_MAX_SHARE = 0.3  # prune() ne briše ništa ako bi nestalo više od ovog dela kataloga
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    brand       TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    record      TEXT NOT NULL,
+    field_times TEXT NOT NULL,
+    fingerprint TEXT,
+    first_seen  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (brand, url)
+);
+"""
+
+
+def canonical_url(url):
+    """URL bez query/fragment dela, sa malim slovima u šemi i hostu."""
+    parts = urlsplit((url or '').strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, '', ''))
+
+
+def _normalized(value):
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {key: _normalized(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalized(item) for item in value]
+    return value
+
+
+def fingerprint(record):
+    """Stabilan heš zapisa: ne zavisi od redosleda ključeva ni od razmaka u tekstu."""
+    canonical = json.dumps(_normalized(record), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def field_diff(old, new, prefix=''):
+    """Razlike po polju {"polje" ili "polje.podpolje": {"staro": ..., "novo": ...}}."""
+    diff = {}
+    for field in list(old) + [f for f in new if f not in old]:
+        before, after = old.get(field), new.get(field)
+        if _normalized(before) == _normalized(after):
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            diff.update(field_diff(before, after, f"{prefix}{field}."))
+        else:
+            diff[f"{prefix}{field}"] = {"staro": before, "novo": after}
+    return diff
+
+
+class CatalogStore:
+    """Katalog jednog brenda u deljenoj bazi; bezbedan za pozive iz više niti."""
+
+    def __init__(self, brand, path=DB_PATH):
+        self.brand = brand
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(products)")}
+        if "fingerprint" not in columns:  # baza iz verzije bez otisaka
+            self._db.execute("ALTER TABLE products ADD COLUMN fingerprint TEXT")
+        self._lock = threading.Lock()
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.changes = {"dodati": {}, "uklonjeni": {}, "izmenjeni": {}}
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM products WHERE brand = ?", (self.brand,)).fetchone()[0]
+
+    def import_json(self, json_path):
+        """Uvoz postojećeg izlaznog JSON-a kada brend još nema redova u bazi."""
+        if len(self) or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Uvoz {json_path} u katalog nije uspeo: {e}")
+            return 0
+        imported = self.upsert_many(records)
+        # log_summary() i skup promena obuhvataju samo izmene ovog run-a, ne uvoz
+        self.inserted = self.updated = self.unchanged = 0
+        self.changes = {"dodati": {}, "uklonjeni": {}, "izmenjeni": {}}
+        logging.info(f"[{self.brand}] Katalog: uvezeno {imported} zapisa iz {json_path}")
+        return imported
+
+    def urls(self):
+        with self._lock:
+            rows = self._db.execute("SELECT url FROM products WHERE brand = ?", (self.brand,)).fetchall()
+        return {url for url, in rows}
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM products WHERE brand = ? AND url = ?", (self.brand, canonical_url(url))
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def records(self):
+        """Svi zapisi brenda redom prvog pojavljivanja, čitani u grupama od BATCH_SIZE."""
+        for batch in self.batches():
+            yield from batch
+
+    def batches(self, size=BATCH_SIZE, containing=None):
+        last = 0
+        while True:
+            with self._lock:
+                if containing is None:
+                    rows = self._db.execute(
+                        "SELECT rowid, record FROM products WHERE brand = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                        (self.brand, last, size)
+                    ).fetchall()
+                else:
+                    rows = self._db.execute(
+                        "SELECT rowid, record FROM products WHERE brand = ? AND rowid > ? AND instr(record, ?) > 0 "
+                        "ORDER BY rowid LIMIT ?",
+                        (self.brand, last, containing, size)
+                    ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [json.loads(record) for _, record in rows]
+
+    def rewrite(self, func, containing=None):
+        """func(batch) menja zapise u mestu; grupe za koje vrati tačnu vrednost se upisuju nazad.
+
+        Uz containing se obilaze samo zapisi čiji sačuvani JSON sadrži taj tekst.
+        """
+        changed = 0
+        for batch in self.batches(containing=containing):
+            if func(batch):
+                changed += self.upsert_many(batch)
+        return changed
+
+    def upsert(self, record):
+        """Upisuje zapis ako je nov ili promenjen; vraća True ako je red upisan."""
+        return self.upsert_many([record]) > 0
+
+    def upsert_many(self, records):
+        written = 0
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for record in records:
+                    url = canonical_url(record.get(URL_FIELD))
+                    if not url:
+                        continue
+                    written += self._upsert(url, record, now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return written
+
+    def _upsert(self, url, record, now):
+        row = self._db.execute(
+            "SELECT record, field_times, fingerprint FROM products WHERE brand = ? AND url = ?", (self.brand, url)
+        ).fetchone()
+        encoded = json.dumps(record, ensure_ascii=False)
+        digest = fingerprint(record)
+        if row is None:
+            field_times = {field: now for field in record}
+            self._db.execute(
+                "INSERT INTO products (brand, url, record, field_times, fingerprint, first_seen, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.brand, url, encoded, json.dumps(field_times), digest, now, now)
+            )
+            self.inserted += 1
+            self._note(url, None, record)
+            return 1
+
+        old = json.loads(row[0])
+        if (row[2] or fingerprint(old)) == digest:
+            self.unchanged += 1
+            return 0
+
+        field_times = json.loads(row[1])
+        for field in set(old) | set(record):
+            if _normalized(old.get(field)) != _normalized(record.get(field)):
+                field_times[field] = now
+        for field in set(field_times) - set(record):
+            del field_times[field]
+        self._db.execute(
+            "UPDATE products SET record = ?, field_times = ?, fingerprint = ?, updated_at = ? WHERE brand = ? AND url = ?",
+            (encoded, json.dumps(field_times), digest, now, self.brand, url)
+        )
+        self.updated += 1
+        self._note(url, old, record)
+        return 1
+
+    def _note(self, url, old, new):
+        """Beleži promenu u skup promena run-a (više izmena istog zapisa se sabira u jednu)."""
+        added, removed, modified = self.changes["dodati"], self.changes["uklonjeni"], self.changes["izmenjeni"]
+        if url in added:
+            base = None
+        elif url in modified:
+            base = modified[url]["pre"]
+        elif url in removed:
+            base = removed[url]
+        else:
+            base = old
+        for bucket in (added, removed, modified):
+            bucket.pop(url, None)
+        if base is None and new is not None:
+            added[url] = new
+        elif new is None:
+            if base is not None:
+                removed[url] = base
+        elif fingerprint(base) != fingerprint(new):
+            modified[url] = {"pre": base, "posle": new}
+
+    def remove(self, urls):
+        """Briše redove za date URL-ove; vraća broj obrisanih."""
+        removed = 0
+        with self._lock:
+            for url in map(canonical_url, urls):
+                row = self._db.execute(
+                    "SELECT record FROM products WHERE brand = ? AND url = ?", (self.brand, url)
+                ).fetchone()
+                if row:
+                    self._db.execute("DELETE FROM products WHERE brand = ? AND url = ?", (self.brand, url))
+                    self._note(url, json.loads(row[0]), None)
+                    removed += 1
+        return removed
+
+    def prune(self, seen, max_share=PRUNE_MAX_SHARE):
+        """
+        Briše zapise brenda čiji URL nije u seen (svi URL-ovi iz listinga / sitemap-a ovog
+        run-a); vraća broj obrisanih. Ako bi nestalo više od max_share kataloga, ništa se
+        ne briše – to je pre promenjen šablon sajta nego povučeni proizvodi.
+        """
+        seen = {canonical_url(url) for url in seen}
+        gone = self.urls() - seen
+        if not gone:
+            return 0
+        total = len(self)
+        if len(gone) > max_share * total:
+            logging.warning(f"[{self.brand}] {len(gone)} od {total} proizvoda nije u listingu – "
+                            f"ne uklanjam ništa (prag {max_share:.0%})")
+            return 0
+        removed = self.remove(gone)
+        logging.info(f"[{self.brand}] Uklonjeno {removed} proizvoda kojih više nema u listingu")
+        return removed
+
+    def field_times(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT field_times FROM products WHERE brand = ? AND url = ?", (self.brand, canonical_url(url))
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def export_json(self, json_path):
+        """
+        Izvoz kataloga brenda u JSON (isti format kao json.dump(..., indent=4)); vraća broj zapisa.
+        Bajt-identičan izvoz ostavlja postojeći fajl netaknutim, a skup promena run-a ide u
+        <json_path>.changes.json (zastareli skup se briše kada promena nema).
+        """
+        count = 0
+        tmp = f"{json_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for record in self.records():
+                body = json.dumps(record, indent=4, ensure_ascii=False).replace('\n', '\n    ')
+                f.write(('\n    ' if count == 0 else ',\n    ') + body)
+                count += 1
+            f.write('\n]' if count else ']')
+        if os.path.exists(json_path) and filecmp.cmp(tmp, json_path, shallow=False):
+            os.remove(tmp)
+            logging.info(f"[{self.brand}] {json_path} bez promena – fajl nije prepisan")
+        else:
+            os.replace(tmp, json_path)
+        self.write_changes(json_path + CHANGES_SUFFIX)
+        return count
+
+    def change_set(self):
+        """Promene ovog run-a: dodati i uklonjeni zapisi, izmenjeni sa razlikama po polju."""
+        return {
+            "brend": self.brand,
+            "vreme": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "dodati": list(self.changes["dodati"].values()),
+            "uklonjeni": [record.get(URL_FIELD) for record in self.changes["uklonjeni"].values()],
+            "izmenjeni": [
+                {URL_FIELD: change["posle"].get(URL_FIELD), "polja": field_diff(change["pre"], change["posle"])}
+                for change in self.changes["izmenjeni"].values()
+            ],
+        }
+
+    def write_changes(self, path):
+        changes = self.change_set()
+        if not (changes["dodati"] or changes["uklonjeni"] or changes["izmenjeni"]):
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(changes, f, indent=4, ensure_ascii=False)
+        logging.info(
+            f"[{self.brand}] Promene: {len(changes['dodati'])} dodatih, {len(changes['uklonjeni'])} uklonjenih, "
+            f"{len(changes['izmenjeni'])} izmenjenih → {path}"
+        )
+        return True
+
+    def log_summary(self):
+        logging.info(
+            f"[{self.brand}] Katalog: {self.inserted} novih, {self.updated} izmenjenih, "
+            f"{self.unchanged} nepromenjenih redova ({self.path})"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
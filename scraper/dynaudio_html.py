@@ -0,0 +1,99 @@
+# dynaudio_html.py
+# HTML ekstraktor Dynaudio stranice proizvoda.
+# • Zaseban modul da bi ga proces parsera (parse_pool) uvezao bez pokretanja skripte brenda
+# • parse_product_page() vraća polja iz stranice; zapis (logo, kategorija iz URL-a) sastavlja skripta
+
+import re
+
+MAIN_URL = "https://dynaudio.com"
+
+
+def get_largest_srcset(srcset):
+    urls = []
+    if not srcset:
+        return None
+    for part in srcset.split(','):
+        if 'http' in part:
+            url = part.strip().split(' ')[0]
+            urls.append(url)
+    return urls[-1] if urls else None
+
+
+def extract_bg_image(style):
+    if not style:
+        return ""
+    match = re.search(r'url\((["\']?)(.*?)\1\)', style)
+    if match:
+        url = match.group(2)
+        return url if url.startswith('http') else MAIN_URL + url
+    return ""
+
+
+def parse_product_page(soup, url):
+    clean_url = url.split('?')[0]
+
+    # IME
+    title = soup.title.get_text(strip=True) if soup.title else "Nedostupan"
+    name = title.split('|')[0].strip() if '|' in title else title
+
+    # OPIS
+    desc_meta = soup.find('meta', {'name': 'description'})
+    desc = desc_meta['content'] if desc_meta and 'content' in desc_meta.attrs else "Opis nije dostupan"
+
+    # SLIKE – PRIORITET: SLAJDER, ZATIM SPECIFICATIONS-MODULE
+    candidates = []
+    # 1. Iz slajdera
+    for li in soup.select('li.product-slider__dnd_area_module_1'):
+        img = li.find('img')
+        if img:
+            srcset = img.get('data-srcset') or img.get('srcset')
+            if srcset:
+                largest = get_largest_srcset(srcset)
+                if largest:
+                    candidates.append(largest)
+            src = img.get('src')
+            if src and src.startswith('http'):
+                candidates.append(src)
+
+    # 2. Fallback za Black Edition
+    if 'black-edition' in clean_url.lower() and not candidates:
+        for img in soup.select('div.specifications-module img'):
+            src = img.get('src')
+            if src and src.startswith('http'):
+                candidates.append(src)
+
+    # SVE SLIKE – SORTIRANE PO VELIČINI (najveće prvo), BEZ OGRANIČENJA
+    imgs = sorted(
+        candidates,
+        key=lambda x: int(re.search(r'width=(\d+)', x).group(1)) if 'width=' in x else 0,
+        reverse=True
+    )  # BEZ [:5] – SVE SLIKE
+
+    # BOJE
+    colors = []
+    color_div = soup.select_one('div.color-pickers')
+    if color_div:
+        for a in color_div.select('a.color-selected'):
+            title = a.get('title')
+            div = a.find('div', class_='colorpicker')
+            if title and div:
+                style = div.get('style', '')
+                url_uzorka = extract_bg_image(style)
+                if title not in [c['boja'] for c in colors]:
+                    colors.append({"boja": title, "url_uzorka": url_uzorka})
+
+    # SPECIFIKACIJE
+    specs = {}
+    specs_ul = soup.select_one('ul.product-specs-table')
+    if specs_ul:
+        for li in specs_ul.find_all('li', class_=re.compile('col-spec_')):
+            label = li.find('span', class_='spec-label')
+            value = li.find('span', 'spec-value')
+            if label and value:
+                k = label.get_text(strip=True).rstrip(':')
+                if 'inches' in k.lower() or 'Packaged' in k or 'incl.' in k.lower():
+                    continue
+                v = value.get_text(strip=True)
+                specs[k] = v
+
+    return {"name": name, "desc": desc, "images": imgs, "colors": colors, "specs": specs}
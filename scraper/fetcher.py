@@ -0,0 +1,350 @@
+# fetcher.py
+# Zajednički sloj za preuzimanje stranica za sve skrejpere (zamena za modulsku
+# cloudscraper instancu u svakom skrejperu).
+# • Fetcher.get() ima isti potpis kao scraper.get() – postojeći kod radi bez izmena
+# • Ograničenje istovremenih zahteva po hostu (per-host semafor)
+# • Učtivost se podešava po brendu: adaptivni tempo po hostu (rate_limit.py) umesto
+#   fiksnih nasumičnih pauza, ponovni pokušaj posle 429/503 uz poštovanje Retry-After
+# • Fetcher.run() kroz asyncio pipelinuje obradu liste URL-ova umesto serijske petlje
+# • Deferred: funkcija može da vrati rezultat koji još nije gotov (npr. HTML koji se parsira
+#   u procesu parsera) – nit se odmah vraća preuzimanju, a run() sačeka future bez zauzete
+#   niti i nastavak (then) izvrši u niti kada rezultat stigne
+# • Memo za ceo run: isti URL (i sa params=, koji ulaze u URL) se ne preuzima dva puta;
+#   ograničen je zbirom tela (MEMO_MAX_BYTES), a Fetcher.soup() čuva parsirane dokumente
+#   za poslednjih MEMO_SOUPS stranica
+# • Trajni keš na disku (http_cache.py) sa TTL-om po brendu i --cache-only režimom
+# • Uslovni GET (If-None-Match / If-Modified-Since): get(url, conditional=True) vraća
+#   304 odgovor kada se stranica nije promenila, pa pozivalac zadržava postojeći zapis
+# • --refresh: postojeći proizvodi se revalidiraju umesto da se preskaču
+# • get_until(): telo se čita u delovima i veza se prekida čim se zatvori traženi deo
+#   stranice (npr. glavni sadržaj ili blok specifikacija) – skripte i footer se ne preuzimaju;
+#   skraćeno telo se kešira (i radi sa --cache-only) kao zaseban unos po obrascu za prekid
+# • stream(): otvoren odgovor mimo keša za sadržaj koji se čita u prolazu (sitemap)
+
+import asyncio
+import functools
+import hashlib
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import cloudscraper
+import requests
+
+from http_cache import CACHE_ONLY, DEFAULT_TTL, NO_CACHE, CacheMiss, ResponseCache, ValidatorStore
+from parsers import make_soup, parser_for
+from rate_limit import BACKOFF_STATUSES, DEFAULT_MAX_RATE, DEFAULT_RATE, RateLimiter, parse_retry_after
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 15
+MAX_RETRIES = 3  # ponovni pokušaji posle 429/503
+MEMO_MAX_BYTES = 256 * 1024 * 1024  # zbir tela odgovora u memu – dovoljno za ceo run brenda
+MEMO_SOUPS = 32  # parsirani dokumenti (višestruko veći od tela) samo za poslednje stranice
+STREAM_CHUNK = 16 * 1024  # veličina dela tela pri get_until()
+STOP_OVERLAP = 4096  # get_until() ponovo pretražuje ovoliko bajtova prethodnog dela (najduži deo obrasca)
+
+
+def with_params(url, params):
+    """URL koji bi requests poslao za get(url, params=params) – ključ za memo i keš."""
+    return requests.Request('GET', url, params=params).prepare().url if params else url
+
+
+def stop_parts(stop_at):
+    """stop_at za get_until(): jedan regex ili niz kratkih regexa koji se traže redom."""
+    return tuple(stop_at) if isinstance(stop_at, (list, tuple)) else (stop_at,)
+
+
+def stop_key(stop_at):
+    """Otisak obrasca za prekid – skraćeno telo je u kešu i memu pod URL-om + ovim ključem."""
+    return hashlib.sha256(b'\0'.join(p.pattern for p in stop_parts(stop_at))).hexdigest()[:16]
+REFRESH = '--refresh' in sys.argv
+
+
+class Deferred:
+    """Vrednost iz future-a (concurrent.futures) koju then(vrednost) pretvara u rezultat."""
+
+    def __init__(self, future, then=None):
+        self.future = future
+        self.then = then or (lambda value: value)
+
+
+def then(value, func):
+    """func(value) odmah, ili – ako je value Deferred – kada stigne; vraća rezultat ili Deferred."""
+    if isinstance(value, Deferred):
+        previous = value.then
+        return Deferred(value.future, lambda resolved: then(previous(resolved), func))
+    return func(value)
+
+
+class Fetcher:
+    """
+    Deljena cloudscraper sesija sa ograničenjem konkurentnosti po hostu.
+
+    concurrency – najviše istovremenih zahteva prema jednom hostu
+    rate        – početni tempo (zahteva/s po hostu); limiter ga prilagođava do max_rate
+    cache_ttl   – koliko dugo (s) je odgovor iz keša na disku svež; 0 isključuje keš
+    """
+
+    def __init__(self, brand, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, max_rate=DEFAULT_MAX_RATE,
+                 timeout=DEFAULT_TIMEOUT, cache_ttl=DEFAULT_TTL, **scraper_kwargs):
+        self.brand = brand
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.session = cloudscraper.create_scraper(
+            browser={'browser': 'chrome', 'platform': 'windows', 'mobile': False},
+            **scraper_kwargs
+        )
+        self.limiter = RateLimiter(self.session.get, rate=rate, max_rate=max_rate)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self._memo = OrderedDict()  # url -> {"response": ..., "size": ..., "soups": {(parser, parse_only): soup}}
+        self._memo_bytes = 0
+        self._souped = OrderedDict()  # URL-ovi čiji unos u memu drži parsirane dokumente
+        self._inflight = {}
+        self.memo_hits = 0
+        self.cache = None if NO_CACHE or not cache_ttl else ResponseCache(ttl=cache_ttl)
+        self.validators = ValidatorStore(brand)
+        self.not_modified = 0
+        if CACHE_ONLY:
+            logging.info(f"[{brand}] --cache-only: mrežni zahtevi su isključeni")
+
+    def _slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.concurrency)
+                self._host_slots[host] = slot
+        return slot
+
+    def _download(self, url, timeout=None, **kwargs):
+        bucket = self.limiter.bucket(url)
+        with self._slot(url):
+            for attempt in range(MAX_RETRIES + 1):
+                bucket.acquire()
+                started = time.monotonic()
+                try:
+                    response = self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+                except Exception:
+                    bucket.feedback(None, time.monotonic() - started)
+                    raise
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                bucket.feedback(response.status_code, time.monotonic() - started, retry_after)
+                if response.status_code not in BACKOFF_STATUSES or attempt == MAX_RETRIES:
+                    return response
+                response.close()
+                logging.info(f"[{self.brand}] HTTP {response.status_code}, pokušaj {attempt + 2}/{MAX_RETRIES + 1}: {url}")
+
+    def _read_until(self, response, stop_at):
+        """
+        Čita telo do kraja poklapanja stop_at; vraća True ako je pročitano celo telo.
+        Niz regexa se traži redom, svaki od kraja poklapanja prethodnog, pa dug blok
+        (npr. od naslova specifikacija do </details>) ne mora da stane u STOP_OVERLAP –
+        u prozor treba da stane samo svaki deo.
+        """
+        parts = stop_parts(stop_at)
+        found = 0  # broj delova koji su već pronađeni
+        position = 0  # kraj poklapanja poslednjeg pronađenog dela
+        data = bytearray()
+        searched = 0
+        try:
+            for chunk in response.iter_content(STREAM_CHUNK):
+                data += chunk
+                # Samo novi deo, uz preklapanje za poklapanje koje počinje u prethodnom delu
+                while found < len(parts):
+                    match = parts[found].search(data, max(position, searched - STOP_OVERLAP))
+                    if not match:
+                        break
+                    found += 1
+                    position = match.end()
+                searched = len(data)
+                if found == len(parts):
+                    response._content = bytes(data[:position])
+                    response.partial = True
+                    logging.debug(f"[{self.brand}] PREKINUTO posle {len(data) // 1024} KB: {response.url}")
+                    return False
+        finally:
+            response.close()
+        response._content = bytes(data)
+        response.partial = False
+        return True
+
+    def _fetch(self, url, timeout=None, conditional=False, stop_at=None, **kwargs):
+        variant = stop_key(stop_at) if stop_at is not None else None
+        cached, fresh = self.cache.load(url, variant) if self.cache else (None, False)
+        if cached is not None and (fresh or CACHE_ONLY):
+            logging.debug(f"[{self.brand}] KEŠ: {url}")
+            return cached
+        if CACHE_ONLY:
+            raise CacheMiss(f"Nije u kešu: {url}")
+
+        # Validatori se šalju ako pozivalac ima sačuvan zapis ili postoji zastareli unos u kešu
+        if conditional or cached is not None:
+            validators = self.validators.headers_for(url, variant)
+            if validators:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **validators}
+
+        if stop_at is not None:
+            kwargs['stream'] = True
+        response = self._download(url, timeout, **kwargs)
+        if stop_at is not None:
+            if response.status_code == 200:
+                self._read_until(response, stop_at)
+            else:
+                response.content  # ostali statusi se čitaju celi
+                response.close()
+
+        if response.status_code == 304:
+            self.not_modified += 1
+            logging.debug(f"[{self.brand}] 304 NEPROMENJENO: {url}")
+            if self.cache and cached is not None:
+                self.cache.touch(url, variant)
+            if conditional or cached is None:
+                return response
+            return cached
+
+        if response.status_code == 200:
+            # Skraćeno telo je zaseban unos (variant), sa validatorima tog odgovora
+            self.validators.update(url, response, variant)
+            if self.cache:
+                self.cache.store(url, response, variant)
+        return response
+
+    def _memo_entry(self, url):
+        with self._lock:
+            entry = self._memo.get(url)
+            if entry is not None:
+                self._memo.move_to_end(url)
+            return entry
+
+    def _remember(self, url, response):
+        size = len(response.content or b'')
+        with self._lock:
+            previous = self._memo.pop(url, None)
+            if previous is not None:
+                self._memo_bytes -= previous["size"]
+            self._memo[url] = {"response": response, "size": size, "soups": {}}
+            self._memo_bytes += size
+            while self._memo_bytes > MEMO_MAX_BYTES and len(self._memo) > 1:
+                _, dropped = self._memo.popitem(last=False)
+                self._memo_bytes -= dropped["size"]
+
+    def _keep_soup(self, url, entry, key, soup):
+        with self._lock:
+            entry["soups"][key] = soup
+            self._souped[url] = entry
+            self._souped.move_to_end(url)
+            while len(self._souped) > MEMO_SOUPS:
+                _, old = self._souped.popitem(last=False)
+                old["soups"].clear()
+
+    def get(self, url, timeout=None, conditional=False, **kwargs):
+        """
+        conditional=True znači da pozivalac već ima zapis za ovaj URL: ako se stranica
+        nije promenila vraća se odgovor sa status_code 304 (bez tela) umesto pune stranice.
+        """
+        url = with_params(url, kwargs.pop('params', None))
+        entry = self._memo_entry(url)
+        if entry is None:
+            # Paralelni pozivi za isti URL čekaju prvi umesto da ga preuzimaju ponovo
+            with self._lock:
+                pending = self._inflight.setdefault(url, threading.Lock())
+            with pending:
+                entry = self._memo_entry(url)
+                if entry is None:
+                    try:
+                        response = self._fetch(url, timeout, conditional, **kwargs)
+                        if response.status_code == 200:
+                            self._remember(url, response)
+                    finally:
+                        # Tek posle upisa u memo: poziv koji stigne posle ovoga nalazi odgovor
+                        with self._lock:
+                            self._inflight.pop(url, None)
+                    return response
+
+        self.memo_hits += 1
+        logging.debug(f"[{self.brand}] MEMO: {url}")
+        return entry["response"]
+
+    def stream(self, url, timeout=None, **kwargs):
+        """
+        Otvoren odgovor (stream=True) mimo keša i mema, uz isti tempo i ograničenja po hostu;
+        pozivalac čita telo (iter_content) i zatvara odgovor. Za sadržaj koji mora biti
+        svež i koji se čita u prolazu (npr. sitemap).
+        """
+        if CACHE_ONLY:
+            raise CacheMiss(f"--cache-only: {url} se ne preuzima")
+        return self._download(url, timeout, stream=True, **kwargs)
+
+    def get_until(self, url, stop_at, timeout=None, conditional=False, **kwargs):
+        """
+        Kao get(), ali se telo čita u delovima i veza prekida čim se u njemu pojavi stop_at
+        (kompajliran bytes regex ili niz njih, vidi _read_until). Skraćen odgovor ima
+        partial=True i u kešu i memu je pod URL-om + stop_key(stop_at), odvojeno od cele
+        stranice; ako se stop_at ne pojavi, odgovor je cela stranica.
+        """
+        variant_url = f"{url}#{stop_key(stop_at)}"
+        # Cela stranica iz mema sadrži i traženi deo
+        entry = self._memo_entry(url) or self._memo_entry(variant_url)
+        if entry is not None:
+            self.memo_hits += 1
+            return entry["response"]
+        response = self._fetch(url, timeout, conditional, stop_at=stop_at, **kwargs)
+        if response.status_code == 200:
+            self._remember(url if not getattr(response, 'partial', False) else variant_url, response)
+        return response
+
+    def soup(self, url, parser=None, parse_only=None, **kwargs):
+        """
+        Vraća parsiran dokument za URL; ponovni poziv u istom run-u ne preuzima
+        niti parsira stranicu ponovo. parse_only (SoupStrainer) gradi samo potrebne čvorove.
+        Greška u preuzimanju se propagira kao RequestException.
+        """
+        parser = parser or parser_for(self.brand)
+        url = with_params(url, kwargs.pop('params', None))
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+
+        entry = self._memo_entry(url)
+        if entry is None or entry["response"] is not response:
+            return make_soup(response.text, parser=parser, parse_only=parse_only)
+        key = (parser, parse_only)
+        soup = entry["soups"].get(key)
+        if soup is None:
+            soup = make_soup(response.text, parser=parser, parse_only=parse_only)
+            self._keep_soup(url, entry, key, soup)
+        return soup
+
+    def run(self, func, items, *args):
+        """
+        Poziva func(item, *args) za svaki item konkurentno i vraća rezultate istim redom.
+        Izuzetak iz jednog poziva se loguje i daje None, ostali nastavljaju.
+        """
+        items = list(items)
+        if not items:
+            return []
+        return asyncio.run(self._run(func, items, args))
+
+    async def _run(self, func, items, args):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix=f"fetch-{self.brand}") as pool:
+            tasks = [self._resolve(loop, pool, functools.partial(func, item, *args)) for item in items]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for item, res in zip(items, results):
+            if isinstance(res, BaseException):
+                logging.error(f"[{self.brand}] Greška u obradi {item}: {res}")
+        return [None if isinstance(res, BaseException) else res for res in results]
+
+    async def _resolve(self, loop, pool, call):
+        # Dok se čeka Deferred, nit je slobodna za sledeće preuzimanje
+        result = await loop.run_in_executor(pool, call)
+        while isinstance(result, Deferred):
+            value = await asyncio.wrap_future(result.future)
+            result = await loop.run_in_executor(pool, result.then, value)
+        return result
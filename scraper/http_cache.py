@@ -0,0 +1,322 @@
+# http_cache.py
+# Trajni keš HTTP odgovora na disku (koristi ga fetcher.Fetcher).
+# • Ključ je SHA-256 normalizovanog URL-a, telo odgovora se čuva po SHA-256 sadržaja
+#   (isti sadržaj sa više URL-ova zauzima mesto samo jednom)
+# • Kompresija: zstd ako je instaliran 'zstandard', inače gzip
+# • TTL po brendu, LRU izbacivanje kada keš pređe zadatu veličinu; uz izbačena tela se
+#   brišu i meta unosi koji na njih pokazuju (i oni koji su ranije ostali bez tela)
+# • --cache-only: sve iz keša, promašaj je greška umesto mrežnog zahteva
+# • variant: skraćeno telo (Fetcher.get_until) je zaseban unos – ključ je URL + otisak
+#   obrasca za prekid, i ima svoje validatore, pa 304 uvek važi za telo koje je sačuvano
+# • ValidatorStore: ETag / Last-Modified po URL-u za uslovne GET zahteve; fajl se upisuje
+#   u grupama (na svakih VALIDATOR_FLUSH_EVERY izmena ili VALIDATOR_FLUSH_INTERVAL sekundi)
+#   i na izlasku iz procesa, ne posle svakog odgovora
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_DIR = os.environ.get("SONUS_HTTP_CACHE", ".http_cache")
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_ONLY = '--cache-only' in sys.argv
+NO_CACHE = '--no-cache' in sys.argv
+EVICT_EVERY = 50  # provera veličine keša na svakih N upisa
+VALIDATOR_FLUSH_EVERY = 100
+VALIDATOR_FLUSH_INTERVAL = 30.0
+KEPT_HEADERS = ('content-type', 'etag', 'last-modified', 'date', 'cache-control')
+
+
+class CacheMiss(requests.exceptions.RequestException):
+    """URL nije u kešu, a mreža je isključena (--cache-only)."""
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and not ((scheme == 'http' and parts.port == 80) or (scheme == 'https' and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def cache_key(url, variant=None):
+    key = normalize_url(url)
+    return f"{key}#{variant}" if variant else key
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+if zstandard is not None:
+    CODEC = 'zst'
+
+    def _compress(data):
+        return zstandard.ZstdCompressor(level=10).compress(data)
+
+    def _decompress(data):
+        return zstandard.ZstdDecompressor().decompress(data)
+else:
+    CODEC = 'gz'
+
+    def _compress(data):
+        return gzip.compress(data, compresslevel=6)
+
+    def _decompress(data):
+        return gzip.decompress(data)
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ResponseCache:
+    """
+    Keš odgovora adresiran sadržajem. load() vraća (response, fresh) – zastareli unos se
+    i dalje vraća (fresh=False) da bi pozivalac mogao da ga koristi za revalidaciju.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._stores = 0
+        self._lock = threading.Lock()
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, 'meta', key[:2], f"{key}.json")
+
+    def _body_path(self, digest, codec):
+        return os.path.join(self.directory, 'bodies', digest[:2], f"{digest}.{codec}")
+
+    def load(self, url, variant=None):
+        key = _sha256(cache_key(url, variant).encode('utf-8'))
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            body_path = self._body_path(meta['body'], meta['codec'])
+            with open(body_path, 'rb') as f:
+                raw = f.read()
+        except (OSError, ValueError, KeyError):
+            return None, False
+
+        if meta['codec'] == 'zst' and zstandard is None:
+            return None, False
+        try:
+            body = _decompress(raw)
+        except Exception as e:
+            logging.warning(f"Oštećen unos u kešu za {url}: {e}")
+            return None, False
+
+        # LRU: vreme poslednjeg korišćenja je mtime tela
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        fresh = time.time() - meta.get('stored_at', 0) < self.ttl
+        return self._to_response(url, meta, body), fresh
+
+    def _to_response(self, url, meta, body):
+        response = requests.Response()
+        response.status_code = meta.get('status', 200)
+        response.reason = 'OK'
+        response.url = meta.get('url', url)
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = meta.get('encoding')
+        response._content = body
+        response.from_cache = True
+        response.partial = meta.get('partial', False)
+        return response
+
+    def store(self, url, response, variant=None):
+        body = response.content
+        digest = _sha256(body)
+        body_path = self._body_path(digest, CODEC)
+        if os.path.exists(body_path):
+            os.utime(body_path)
+        else:
+            _write_atomic(body_path, _compress(body))
+
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+            'encoding': response.encoding,
+            'stored_at': time.time(),
+            'body': digest,
+            'codec': CODEC,
+            'partial': getattr(response, 'partial', False),
+            'variant': variant,
+        }
+        key = _sha256(cache_key(url, variant).encode('utf-8'))
+        _write_atomic(self._meta_path(key), json.dumps(meta).encode('utf-8'))
+
+        with self._lock:
+            self._stores += 1
+            run_eviction = self._stores % EVICT_EVERY == 0
+        if run_eviction:
+            self.evict()
+
+    def urls(self):
+        """Originalni URL-ovi svih unosa u kešu (npr. za parity.py)."""
+        for root, _, files in os.walk(os.path.join(self.directory, 'meta')):
+            for name in files:
+                try:
+                    with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if meta.get('variant') or 'url' not in meta:
+                    continue  # skraćena tela (get_until) nisu cele stranice
+                yield meta['url']
+
+    def touch(self, url, variant=None):
+        """Produžava svežinu unosa (npr. posle 304 odgovora)."""
+        key = _sha256(cache_key(url, variant).encode('utf-8'))
+        path = self._meta_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            meta['stored_at'] = time.time()
+            _write_atomic(path, json.dumps(meta).encode('utf-8'))
+        except (OSError, ValueError):
+            pass
+
+    def evict(self):
+        """Briše najduže nekorišćena tela dok keš ne stane u max_bytes, pa meta unose bez tela."""
+        bodies = []
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.directory, 'bodies')):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                bodies.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+        bodies.sort()
+        removed = 0
+        for _, size, path in bodies:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        orphans = self._sweep_meta() if removed else 0
+        logging.info(
+            f"HTTP keš: izbačeno {removed} tela i {orphans} meta unosa, trenutna veličina {total / 1024 / 1024:.1f} MB"
+        )
+
+    def _sweep_meta(self):
+        # Telo se upisuje pre meta unosa, pa meta čije telo ne postoji nije unos koji se upravo pravi
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.directory, 'meta')):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                    body_path = self._body_path(meta['body'], meta['codec'])
+                except (OSError, ValueError, KeyError):
+                    continue
+                if os.path.exists(body_path):
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+        return removed
+
+
+class ValidatorStore:
+    """
+    ETag / Last-Modified vrednosti po normalizovanom URL-u, jedan JSON fajl po brendu.
+    Čuvaju se nezavisno od tela odgovora, pa uslovni GET radi i kad je telo izbačeno iz keša.
+    """
+
+    def __init__(self, brand, directory=CACHE_DIR, flush_every=VALIDATOR_FLUSH_EVERY,
+                 flush_interval=VALIDATOR_FLUSH_INTERVAL):
+        self.path = os.path.join(directory, 'validators', f"{brand}.json")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+        atexit.register(self.flush)
+
+    def headers_for(self, url, variant=None):
+        with self._lock:
+            entry = self._data.get(cache_key(url, variant))
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url, response, variant=None):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._data[cache_key(url, variant)] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'checked_at': time.time(),
+            }
+            self._dirty += 1
+            if self._dirty >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        try:
+            _write_atomic(self.path, json.dumps(self._data, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logging.warning(f"Validatori nisu sačuvani ({self.path}): {e}")
+            return
+        self._dirty = 0
+        self._last_flush = time.monotonic()
@@ -0,0 +1,111 @@
+# journal.py
+# Dnevnik završenih zapisa tokom skrejpovanja (append-only JSONL).
+# • Svaki završen zapis se dopisuje kao jedan red čim ga nit vrati (recorded() oko funkcije
+#   za Fetcher.run), a ne tek posle cele liste; fsync ide u grupama (na svakih
+#   FSYNC_EVERY zapisa ili FSYNC_INTERVAL sekundi), pa pad procesa gubi najviše poslednju grupu;
+#   zapis koji se još parsira (fetcher.Deferred) upisuje se kada bude gotov
+# • Posle prekida replay() vraća zapise iz dnevnika: skrejper ih ubacuje u skupove za
+#   preskakanje i u izlaz, pa nastavak ne ponavlja već urađen posao
+# • Poslednji red prekinut usred upisa se ignoriše
+# • Kada se izlazni JSON uspešno sačuva (kompakcija), dnevnik se briše – discard()
+
+import json
+import logging
+import os
+import threading
+import time
+
+from fetcher import then
+
+FSYNC_EVERY = 20
+FSYNC_INTERVAL = 5.0
+SUFFIX = ".journal.jsonl"
+
+
+class Journal:
+    """Dnevnik uz izlazni fajl: <output>.journal.jsonl."""
+
+    def __init__(self, output_path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = output_path + SUFFIX
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self.appended = 0
+
+    def replay(self):
+        """Zapisi iz dnevnika prethodnog (prekinutog) run-a, redom upisa."""
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        logging.warning(f"Dnevnik {self.path}: oštećen red {line_no} se preskače")
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logging.error(f"Dnevnik {self.path} nije pročitan: {e}")
+            return []
+        if records:
+            logging.info(f"NASTAVAK: {len(records)} zapisa iz dnevnika {self.path}")
+        return records
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if self._file.tell() and not self._ends_with_newline():
+                    self._file.write('\n')  # red prekinut usred upisa ostaje zaseban (oštećen) red
+            self._file.write(line)
+            self._file.flush()
+            self.appended += 1
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def recorded(self, func):
+        """func čiji se rezultat (ako postoji) upisuje u dnevnik čim je gotov – za Fetcher.run()."""
+        def record(result):
+            if result:
+                self.append(result)
+            return result
+
+        def wrapper(*args, **kwargs):
+            return then(func(*args, **kwargs), record)
+        return wrapper
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                if self._pending:
+                    self._sync()
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Izlaz je sačuvan – dnevnik više nije potreban."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"Dnevnik {self.path} nije obrisan: {e}")
@@ -0,0 +1,72 @@
+# membership.py
+# Indeks pripadnosti proizvoda kolekcijama/kategorijama, pravi se u jednom prolazu
+# kroz listing odgovore PRE preuzimanja detalja.
+# • Svaki proizvod se skrejpuje tačno jednom, bez obzira u koliko se kolekcija pojavljuje
+# • Zapis dobija sve kolekcije, a ne samo onu koja je slučajno bila prva
+# • apply(): kolekcije se upisuju i u zapise iz kataloga koji se u ovom run-u ne skrejpuju
+
+import logging
+
+
+class MembershipIndex:
+    """Ključ proizvoda (URL ili handle) -> kolekcije, oba u redosledu prvog pojavljivanja."""
+
+    def __init__(self):
+        self._members = {}
+
+    def add(self, key, collection):
+        collections = self._members.setdefault(key, [])
+        if collection not in collections:
+            collections.append(collection)
+
+    def add_listing(self, collection, keys):
+        for key in keys:
+            self.add(key, collection)
+
+    def collections(self, key):
+        return list(self._members.get(key, []))
+
+    def primary(self, key, priority=()):
+        """Prva kolekcija iz liste prioriteta kojoj proizvod pripada, inače prva u kojoj je viđen."""
+        collections = self._members.get(key, [])
+        for collection in priority:
+            if collection in collections:
+                return collection
+        return collections[0] if collections else None
+
+    def apply(self, records, url_field="url_proizvoda", keep_existing=False):
+        """Upisuje kolekcije u dodatne_informacije.kolekcije zapisa iz indeksa; vraća broj izmenjenih.
+
+        keep_existing: postojeće kolekcije se ne brišu (listing nije pročitan ceo).
+        """
+        changed = 0
+        for record in records:
+            key = record.get(url_field)
+            if key not in self._members:
+                continue
+            info = record.setdefault("dodatne_informacije", {})
+            old = info.get("kolekcije") or []
+            collections = self.collections(key)
+            if keep_existing:
+                collections = old + [c for c in collections if c not in old]
+            if old != collections:
+                info["kolekcije"] = collections
+                changed += 1
+        return changed
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def __len__(self):
+        return len(self._members)
+
+    def __contains__(self, key):
+        return key in self._members
+
+    def log_summary(self):
+        listed = sum(len(c) for c in self._members.values())
+        multi = sum(1 for c in self._members.values() if len(c) > 1)
+        logging.info(
+            f"Indeks kolekcija: {len(self._members)} jedinstvenih proizvoda iz {listed} listing unosa "
+            f"({multi} proizvoda u više kolekcija)"
+        )
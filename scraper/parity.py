@@ -0,0 +1,125 @@
+# parity.py
+# Provera pariteta HTML parsera (parsers.py) na stranicama proizvoda sačuvanim u HTTP kešu.
+# • Isti ekstraktor brenda se pušta kroz sve instalirane parsere, a JSON zapisi se
+#   porede bajt po bajt sa zapisom iz podrazumevanog 'html.parser'
+# • Za svaki parser ispisuje broj identičnih zapisa, prva odstupanja i vreme parsiranja
+# • Statistika selektora se ne beleži (selector_stats.json ostaje samo iz run-ova skrejpera)
+# • Ništa se ne menja automatski: za brend čiji su SVI zapisi identični, a parser brži,
+#   samo se loguje predlog reda za parsers.PARSER_BY_BRAND; red u mapu upisuje održavalac
+# Upotreba: python parity.py [denon marantz polk bowers]
+
+import importlib
+import json
+import logging
+import sys
+import time
+from urllib.parse import urlsplit
+
+from http_cache import ResponseCache
+from parsers import DEFAULT_PARSER, available_parsers, make_soup
+import selector_registry
+
+# brend -> (host, modul, ekstraktor(soup, url))
+EXTRACTORS = {
+    "denon": ("www.denon.com", "sfcc", "parse_product_page"),
+    "marantz": ("www.marantz.com", "sfcc", "parse_product_page"),
+    "polk": ("www.polkaudio.com", "polk_html", "parse_product_html"),
+    "bowers": ("www.bowerswilkins.com", "bowers_html", "parse_product_html"),
+}
+MAX_REPORTED = 5  # broj prijavljenih odstupanja po parseru
+
+
+def is_product_page(url):
+    path = urlsplit(url).path
+    return '/product/' in path and path.endswith('.html')
+
+
+def record_bytes(record):
+    return json.dumps(record, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+
+def first_difference(expected, actual):
+    for key in sorted(set(expected) | set(actual)):
+        if record_bytes(expected.get(key)) != record_bytes(actual.get(key)):
+            return key
+    return None
+
+
+def stored_pages(cache, host):
+    pages = []
+    for url in cache.urls():
+        if urlsplit(url).netloc != host or not is_product_page(url):
+            continue
+        response, _ = cache.load(url)
+        if response is not None and response.status_code == 200:
+            pages.append((url, response.text))
+    return pages
+
+
+def check_brand(brand, cache, parsers):
+    """Vraća {parser: (identično, ukupno, sekunde)} za jedan brend."""
+    host, module, name = EXTRACTORS[brand]
+    extractor = getattr(importlib.import_module(module), name)
+    pages = stored_pages(cache, host)
+    if not pages:
+        logging.warning(f"[{brand}] nema sačuvanih stranica proizvoda u kešu ({cache.directory})")
+        return {}
+
+    results = {}
+    baseline = {}
+    for parser in [DEFAULT_PARSER] + [p for p in parsers if p != DEFAULT_PARSER]:
+        identical = 0
+        reported = 0
+        started = time.perf_counter()
+        with selector_registry.brand_context(brand):
+            records = [(url, extractor(make_soup(html, parser=parser), url)) for url, html in pages]
+        elapsed = time.perf_counter() - started
+
+        for url, record in records:
+            if parser == DEFAULT_PARSER:
+                baseline[url] = record
+                identical += 1
+            elif record_bytes(record) == record_bytes(baseline[url]):
+                identical += 1
+            elif reported < MAX_REPORTED:
+                reported += 1
+                logging.info(f"[{brand}] {parser}: razlika u '{first_difference(baseline[url], record)}' – {url}")
+        results[parser] = (identical, len(records), elapsed)
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # Iste stranice kroz više parsera nisu statistika selektora iz run-a skrejpera
+    selector_registry.disable_stats()
+    brands = [a for a in sys.argv[1:] if not a.startswith('--')] or list(EXTRACTORS)
+    unknown = [b for b in brands if b not in EXTRACTORS]
+    if unknown:
+        logging.error(f"Nepoznati brendovi: {', '.join(unknown)} (dostupni: {', '.join(EXTRACTORS)})")
+        return 2
+
+    parsers = available_parsers()
+    logging.info(f"Parseri: {', '.join(parsers)}")
+    cache = ResponseCache()
+    proven = {}
+    for brand in brands:
+        results = check_brand(brand, cache, parsers)
+        base_time = results.get(DEFAULT_PARSER, (0, 0, 0.0))[2]
+        for parser, (identical, total, elapsed) in results.items():
+            speedup = base_time / elapsed if elapsed else 0.0
+            status = "PARITET" if identical == total else "RAZLIKE"
+            logging.info(f"[{brand}] {parser:<12} {identical}/{total} identično | {elapsed:.2f}s (x{speedup:.1f}) | {status}")
+        fastest = [p for p, (i, t, _) in sorted(results.items(), key=lambda kv: kv[1][2])
+                   if i == t and p != DEFAULT_PARSER]
+        if fastest and results[fastest[0]][2] < base_time:
+            proven[brand] = fastest[0]
+
+    if proven:
+        logging.info("Predlog za parsers.PARSER_BY_BRAND:")
+        for brand, parser in proven.items():
+            logging.info(f'    "{brand}": "{parser}",')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
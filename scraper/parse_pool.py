@@ -0,0 +1,149 @@
+# parse_pool.py
+# Faza parsiranja HTML-a odvojena od preuzimanja.
+# • Koriste je stranice proizvoda: HTML fallback u sfcc.load_fields() (Denon, Marantz, Polk,
+#   Bowers kada Product-Show JSON nije dostupan), Dynaudio i Q-Acoustics sekcije; JSON putanja
+#   ne parsira HTML, a stranice kategorija se čitaju na glavnoj niti pre preuzimanja proizvoda
+# • submit() vraća future: nit Fetcher-a se odmah vraća preuzimanju, BeautifulSoup parsiranje
+#   radi u ProcessPoolExecutor-u, a zapis se dovršava kada future stigne (fetcher.Deferred)
+# • Ekstraktor je funkcija iz modula koji se može uvesti bez sporednih efekata (sfcc,
+#   polk_html, bowers_html, dynaudio_html, qacoustics_html), nikad iz skripte brenda: spawn
+#   proces uvozi modul ekstraktora
+# • Ekstraktor koji ne može da se serijalizuje parsira se u istoj niti; posao koji je zatekao
+#   pokvaren pool ide u rezervni thread pool, ne u callback future-a (nit menadžera pool-a)
+# • --no-parse-pool: sve se parsira u nitima kao ranije
+# • Statistika selektora (selector_registry) iz procesa parsera se vraća uz zapis
+
+import atexit
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import selector_registry
+from parsers import make_soup
+
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+INLINE = '--no-parse-pool' in sys.argv
+
+_pool = None
+_fallback = None
+_broken = False
+_picklable = {}
+_lock = threading.Lock()
+
+
+def _extract(extractor, content, url, brand):
+    with selector_registry.brand_context(brand):
+        return extractor(make_soup(content, brand), url)
+
+
+def _extract_in_process(extractor, content, url, brand):
+    return _extract(extractor, content, url, brand), selector_registry.take_stats()
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None and not _broken:
+            # spawn umesto fork: fork iz procesa sa aktivnim nitima može da zaključa potomka
+            _pool = ProcessPoolExecutor(PARSE_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+            logging.info(f"Parser pool: {PARSE_WORKERS} procesa")
+        return _pool
+
+
+def _get_fallback():
+    global _fallback
+    with _lock:
+        if _fallback is None:
+            _fallback = ThreadPoolExecutor(PARSE_WORKERS, thread_name_prefix="parse-fallback")
+        return _fallback
+
+
+def _can_send(extractor):
+    if extractor not in _picklable:
+        try:
+            pickle.dumps(extractor)
+            _picklable[extractor] = True
+        except Exception as e:
+            logging.warning(f"Ekstraktor {getattr(extractor, '__name__', extractor)} se parsira u niti: {e}")
+            _picklable[extractor] = False
+    return _picklable[extractor]
+
+
+def _inline(extractor, content, url, brand):
+    future = Future()
+    try:
+        future.set_result(_extract(extractor, content, url, brand))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def submit(extractor, content, url, brand=None):
+    """Future sa extractor(soup, url), izračunatim u procesu parsera; pozivalac ne čeka rezultat."""
+    if INLINE or _broken or not _can_send(extractor):
+        return _inline(extractor, content, url, brand)
+    pool = _get_pool()
+    if pool is None:
+        return _inline(extractor, content, url, brand)
+    try:
+        pending = pool.submit(_extract_in_process, extractor, content, url, brand)
+    except BrokenProcessPool as e:
+        _mark_broken(e)
+        return _inline(extractor, content, url, brand)
+
+    future = Future()
+
+    def done(pending):
+        try:
+            record, stats = pending.result()
+        except BrokenProcessPool as e:
+            _mark_broken(e)
+            retry = _get_fallback().submit(_extract, extractor, content, url, brand)
+            retry.add_done_callback(lambda retry: _copy(retry, future))
+            return
+        except Exception as e:
+            future.set_exception(e)
+            return
+        selector_registry.merge_stats(stats)
+        future.set_result(record)
+
+    pending.add_done_callback(done)
+    return future
+
+
+def _copy(source, target):
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def parse(extractor, content, url, brand=None):
+    """Kao submit(), ali čeka rezultat."""
+    return submit(extractor, content, url, brand).result()
+
+
+def _mark_broken(error):
+    global _broken
+    if not _broken:
+        logging.error(f"Parser pool je pao ({error}), nastavljam parsiranje u nitima")
+    _broken = True
+
+
+def shutdown():
+    global _pool, _fallback
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+        if _fallback is not None:
+            _fallback.shutdown(cancel_futures=True)
+            _fallback = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,82 @@
+# parsers.py
+# Izbor HTML parsera po brendu.
+# • Ekstraktori ostaju na BeautifulSoup API-ju i istim CSS selektorima; menja se samo
+#   parser ispod njega: 'html.parser' (čist Python) ili 'lxml' (C, višestruko brži)
+# • Izbor bržeg parsera je opt-in: PARSER_BY_BRAND je prazan (svi brendovi koriste
+#   'html.parser') dok se u njega ručno ne prepiše predlog iz parity.py, koji se daje tek
+#   kada su zapisi bajt-identični na sačuvanim stranicama
+# • --parser=<ime> nameće parser svim brendovima za jedan run (za parity.py i debug)
+# • Delimično parsiranje: parse_only=SoupStrainer gradi samo čvorove koje funkcija čita
+#   (header navigacija, kartice proizvoda, logo); any_of() spaja više strainera
+
+import sys
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+DEFAULT_PARSER = 'html.parser'
+CANDIDATES = ('html.parser', 'lxml')
+
+# brend (kao u Fetcher(brand)) -> parser sa dokazanim paritetom; popunjava se ručno iz
+# izlaza parity.py, do tada --parser=<ime>
+PARSER_BY_BRAND = {}
+
+
+def _forced_parser():
+    for arg in sys.argv:
+        if arg.startswith('--parser='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+FORCED_PARSER = _forced_parser()
+
+
+def available_parsers():
+    """Parseri iz CANDIDATES koji su instalirani."""
+    available = []
+    for name in CANDIDATES:
+        try:
+            BeautifulSoup('<p></p>', name)
+        except Exception:
+            continue
+        available.append(name)
+    return available
+
+
+def parser_for(brand=None):
+    return FORCED_PARSER or PARSER_BY_BRAND.get(brand, DEFAULT_PARSER)
+
+
+def make_soup(content, brand=None, parser=None, parse_only=None):
+    return BeautifulSoup(content, parser or parser_for(brand), parse_only=parse_only)
+
+
+class AnyOf(SoupStrainer):
+    """Strainer koji propušta tag (sa celim podstablom) ako ga propušta bilo koji od zadatih."""
+
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    # bs4 >= 4.13
+    @property
+    def excludes_everything(self):
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(s.allow_tag_creation(nsprefix, name, attrs) for s in self.strainers)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # bs4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        for strainer in self.strainers:
+            found = strainer.search_tag(markup_name, markup_attrs)
+            if found:
+                return found
+        return None
+
+
+def any_of(*strainers):
+    return AnyOf(*[s for s in strainers if s is not None])
@@ -0,0 +1,112 @@
+# polk_html.py
+# HTML ekstraktor Polk Audio stranice proizvoda (fallback kada SFCC JSON nije dostupan).
+# • Zaseban modul da bi ga proces parsera (parse_pool) i parity.py uvezli bez pokretanja
+#   skripte brenda (Fetcher, katalog, uzorci boja)
+# • parse_product_html() vraća ista polja kao sfcc.product_fields, plus broj fallback specifikacija
+
+import logging
+import re
+
+from selector_registry import first, first_text
+
+# Fallback specifikacija čita samo sekcije specifikacija / pregleda, ne celu stranicu
+MIN_SPECS = 8
+FALLBACK_SCOPE = ('.specifications-wrapper, #product-specifications, section[data-tab="SPECIFICATIONS"], '
+                  'section[data-tab="OVERVIEW"], #product-description, .product__description')
+FALLBACK_BANNED = re.compile(r'in stock|add to cart|reviews|shipping|warranty|buy now|price|sale|save|free delivery|rating', re.I)
+FALLBACK_LINE = re.compile(r'^[^\S\n]*([^:\n]+?)[^\S\n]*:[^\S\n]*([^\n]*?)[^\S\n]*$', re.M)
+MAX_LINE = 200
+
+# === PARSIRANJE HTML-a – specifikacije BEZ prefiksa grupe ===
+def parse_html(soup, json_data, handle):
+    opis = ""
+    meta = soup.find('meta', {'name': 'description'})
+    if meta and meta.get('content'): opis = meta['content'].strip()
+    if len(opis) < 100:
+        sec = first(soup, 'description', ['#product-description', '.product__description', 'section[data-tab="OVERVIEW"]'])
+        if sec:
+            opis = ' '.join([p.get_text(strip=True) for p in sec.find_all('p') if p.get_text(strip=True)]) or sec.get_text(strip=True)
+
+    specs = {}
+    for wrapper in soup.select('.specifications-wrapper'):
+        ul = wrapper.select_one('ul.specifications-list')
+        if ul:
+            for li in ul.find_all('li'):
+                name = li.select_one('.name')
+                value = li.select_one('.value')
+                if name and value:
+                    k = name.get_text(strip=True).rstrip(':')
+                    v = value.get_text(strip=True)
+                    specs[k] = v
+
+    # Fallback ako je malo specifikacija – "ključ: vrednost" redovi samo iz sekcija specifikacija
+    fallback = 0
+    if len(specs) < MIN_SPECS:
+        fallback = fallback_specs(soup, specs)
+        logging.debug(f"[v1.1.1] Fallback specifikacija za {handle}: +{fallback}")
+
+    cat = "Nepoznato"
+    breadcrumb = first(soup, 'category', ['.breadcrumb', '.breadcrumbs'])
+    if breadcrumb:
+        links = breadcrumb.find_all('a')
+        if links and len(links) > 1:
+            cat = links[-2].get_text(strip=True)
+
+    return opis or "Opis nedostupan", specs, cat, fallback
+
+def fallback_specs(soup, specs):
+    """Dodaje u specs 'ključ: vrednost' redove iz FALLBACK_SCOPE sekcija; vraća broj dodatih."""
+    added = 0
+    for section in soup.select(FALLBACK_SCOPE):
+        for m in FALLBACK_LINE.finditer(section.get_text(separator='\n')):
+            if len(m.group(0)) >= MAX_LINE or FALLBACK_BANNED.search(m.group(0)):
+                continue
+            k, v = m.group(1).strip(), m.group(2).strip()
+            if k and v and k not in specs:
+                specs[k] = v
+                added += 1
+    return added
+
+# === HTML FALLBACK (ista polja kao sfcc.product_fields) ===
+def parse_product_html(soup, product_url):
+    title = first_text(soup, 'title', ['h1.product-name', 'h1.title'])
+
+    sku = first(soup, 'pid', '[data-productid]')
+    sku = sku['data-productid'].strip() if sku and 'data-productid' in sku.attrs else None
+
+    price = first_text(soup, 'price', ['.price-sales', '.price', '.sales'])
+
+    # Slike – iz srcset
+    images = []
+    for img in soup.select('img[srcset], img[data-srcset]'):
+        srcset = img.get('srcset') or img.get('data-srcset')
+        if srcset:
+            srcs = [s.strip().split(' ')[0] for s in srcset.split(',')]
+            largest = max(srcs, key=lambda x: int(re.search(r'width=(\d+)', x).group(1)) if re.search(r'width=(\d+)', x) else 0)
+            images.append(largest)
+
+    # Specifikacije – bez prefiksa
+    opis, specs, cat, fallback = parse_html(soup, None, product_url)
+
+    # Boje – URL slike iz koje se uzima uzorak
+    colors = []
+    for sw in soup.select('.swatch, .color-swatch, .swatch-item'):
+        color_name = sw.get('data-color') or sw.get('title') or sw.get_text(strip=True)
+        if not color_name or color_name in ["Select Color", ""]: continue
+        img_tag = sw.find('img')
+        img_url = img_tag['src'] if img_tag and 'src' in img_tag.attrs else None
+        colors.append({"boja": color_name, "url_uzorka": img_url})
+
+    return {
+        "title": title,
+        "pid": sku,
+        "cena": price,
+        "opis": opis,
+        "tagline": None,
+        "images": images,
+        "specs": specs,
+        "category": cat if cat != "Nepoznato" else None,
+        "colors": colors,
+        "available": None,
+        "fallback_specs": fallback,
+    }
@@ -0,0 +1,111 @@
+# qacoustics_html.py
+# HTML ekstraktor Q-Acoustics sekcija proizvoda (tip, swatch-evi, specifikacije).
+# • Zaseban modul da bi ga proces parsera (parse_pool) uvezao bez pokretanja skripte brenda
+# • parse_product_sections() ne baca izuzetak: greška parsiranja se vraća u polju "error",
+#   a skripta tada zadržava zapis iz JSON-a bez specifikacija (kao i pre)
+
+import logging
+from urllib.parse import urljoin
+
+MAIN_URL = "https://www.qacoustics.com/"
+
+def parse_specifications(soup):
+    specs = {}
+    details_tags = soup.find_all('details', class_='details')
+    for details in details_tags:
+        summary = details.find('summary')
+        if summary and 'Specification' in summary.get_text():
+            p_tags = details.select('div.specification p')
+            if not p_tags:
+                p_tags = details.find_all('p')
+            for p in p_tags:
+                strong_tag = p.find('strong')
+                if strong_tag:
+                    key = strong_tag.get_text(strip=True).rstrip(':')
+                    value = p.get_text(strip=True).replace(strong_tag.get_text(strip=True), '').strip()
+                    specs[key] = value
+            break
+    return specs
+
+def parse_available_colors(soup):
+    colors = []
+    ul = soup.select_one('ul.swatches')
+    if not ul:
+        logging.debug("parse_available_colors: Nije pronađen 'ul.swatches' element.")
+        return colors
+
+    for li in ul.find_all('li'):
+        magnet = li.find('magnet-element')
+        if not magnet:
+            logging.debug("parse_available_colors: Nije pronađen 'magnet-element' unutar 'li'.")
+            colors.append({"boja": "Unknown", "url_uzorka": ""})
+            continue
+
+        input_tag = magnet.find('input', {'type': 'radio'})
+        label = magnet.find('label', class_='color-swatch')
+        if not input_tag or not label:
+            logging.debug("parse_available_colors: Nije pronađen 'input' ili 'label.color-swatch' unutar 'magnet-element'.")
+            colors.append({"boja": "Unknown", "url_uzorka": ""})
+            continue
+
+        color_name = input_tag.get('value') or label.get('title') or ''
+        color_name = color_name.strip()
+        logging.debug(f"parse_available_colors: Obrađujem boju: '{color_name}'")
+
+        style = label.get('style', '')
+        logging.debug(f"parse_available_colors: Raw style attribute for '{color_name}' (repr): {repr(style)}")
+        logging.debug(f"parse_available_colors: Raw style attribute for '{color_name}': '{style}'")
+
+        img_url = ''
+
+        if not style or not isinstance(style, str):
+            logging.warning(f"parse_available_colors: 'style' atribut je prazan ili nije string za '{color_name}'. Vrednost: {repr(style)}")
+            colors.append({"boja": color_name, "url_uzorka": ""})
+            continue
+
+        if '--swatch-background-image:' in style:
+            try:
+                start_url_func = style.find('url(')
+                if start_url_func != -1:
+                    end_url_func = style.find(')', start_url_func)
+                    if end_url_func != -1:
+                        raw_img_url = style[start_url_func + 4:end_url_func].strip()
+                        if raw_img_url.startswith("'") and raw_img_url.endswith("'"):
+                            raw_img_url = raw_img_url[1:-1]
+                        elif raw_img_url.startswith('"') and raw_img_url.endswith('"'):
+                            raw_img_url = raw_img_url[1:-1]
+
+                        img_url = raw_img_url
+                        img_url = img_url.replace('&amp;', '&')
+                        if img_url.startswith('//'):
+                            img_url = 'https:' + img_url
+                        elif img_url.startswith('/'):
+                            img_url = urljoin(MAIN_URL, img_url)
+                        logging.debug(f"parse_available_colors: Uspešno izvučen i obrađen 'url_uzorka' za '{color_name}': '{img_url}'")
+                    else:
+                        logging.warning(f"parse_available_colors: Nije pronađena zatvorena zagrada ')' za 'url(' u stilu za '{color_name}'. Stil: '{style}'")
+                else:
+                    logging.warning(f"parse_available_colors: Nije pronađena 'url(' funkcija u stilu za '{color_name}'. Stil: '{style}'")
+            except Exception as e:
+                logging.error(f"parse_available_colors: Greška pri parsiranju URL-a string metodama za '{color_name}'. Stil: '{style}'. Greška: {e}")
+        else:
+            logging.debug(f"parse_available_colors: '--swatch-background-image:' nije pronađen u stilu za '{color_name}'. Stil: '{style}'")
+
+        colors.append({
+            "boja": color_name,
+            "url_uzorka": img_url
+        })
+
+    return colors
+
+
+def parse_product_sections(soup, product_url):
+    try:
+        product_type = soup.select_one('div.product-info__type a')
+        return {
+            "specs": parse_specifications(soup),
+            "colors": parse_available_colors(soup),
+            "type": product_type.get_text(strip=True) if product_type else None,
+        }
+    except Exception as e:
+        return {"specs": {}, "colors": [], "type": None, "error": str(e)}
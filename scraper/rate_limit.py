@@ -0,0 +1,155 @@
+# rate_limit.py
+# Adaptivni limiter zahteva po hostu (token bucket) – zamena za fiksne
+# time.sleep(random.uniform(...)) pauze u skrejperima.
+# • Tempo raste dok su odgovori brzi i 2xx/304, pada na sporim odgovorima
+# • 429/503: tempo se prepolovi, poštuje se Retry-After
+# • robots.txt Crawl-delay postavlja gornju granicu tempa za host (i ispod min_rate);
+#   čita se pre prvog zahteva prema hostu, i kada prvi zahtevi idu paralelno
+# • Efektivni tempo (zahteva/s) se periodično loguje
+
+import logging
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+DEFAULT_RATE = 1.0       # početni tempo, zahteva u sekundi po hostu
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 4.0
+FAST_RESPONSE = 1.0      # s – brži odgovor je signal da host ima kapaciteta
+SLOW_RESPONSE = 4.0      # s – sporiji odgovor je signal preopterećenja
+RATE_STEP = 0.1          # aditivno povećanje po brzom odgovoru
+BACKOFF_STATUSES = (429, 503)
+DEFAULT_BACKOFF = 30.0   # s – kada 429/503 nema Retry-After
+LOG_EVERY = 50           # loguje efektivni tempo na svakih N zahteva po hostu
+RATE_WINDOW = 60.0       # s – prozor za računanje efektivnog tempa
+
+
+def parse_retry_after(value):
+    """Retry-After je broj sekundi ili HTTP datum; vraća sekunde ili None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostBucket:
+    def __init__(self, host, rate, min_rate, max_rate):
+        self.host = host
+        self.min_rate = min_rate
+        self.max_rate = max(min_rate, max_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.recent = deque()
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def limit_max_rate(self, max_rate):
+        with self._lock:
+            # Crawl-delay sajta ima prednost i nad donjom granicom tempa
+            self.max_rate = min(self.max_rate, max_rate)
+            self.min_rate = min(self.min_rate, self.max_rate)
+            self.rate = min(self.rate, self.max_rate)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self._record(now)
+                    return
+                wait = max(self.blocked_until - now, (1.0 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def _record(self, now):
+        self.recent.append(now)
+        while self.recent and now - self.recent[0] > RATE_WINDOW:
+            self.recent.popleft()
+        self.count += 1
+        if self.count % LOG_EVERY == 0:
+            span = now - self.recent[0]
+            effective = (len(self.recent) - 1) / span if span > 0 else 0.0
+            logging.info(
+                f"[{self.host}] efektivni tempo: {effective:.2f} zahteva/s "
+                f"(cilj {self.rate:.2f}, max {self.max_rate:.2f}) | ukupno {self.count}"
+            )
+
+    def feedback(self, status, elapsed, retry_after=None):
+        with self._lock:
+            if status in BACKOFF_STATUSES:
+                self.rate = max(self.min_rate, self.rate / 2)
+                pause = retry_after if retry_after is not None else DEFAULT_BACKOFF
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+                logging.warning(f"[{self.host}] HTTP {status} – usporavam na {self.rate:.2f} zahteva/s, pauza {pause:.0f}s")
+            elif status is None or elapsed > SLOW_RESPONSE or status >= 500:
+                self.rate = max(self.min_rate, self.rate * 0.8)
+            elif (200 <= status < 300 or status == 304) and elapsed < FAST_RESPONSE:
+                self.rate = min(self.max_rate, self.rate + RATE_STEP)
+
+
+class RateLimiter:
+    """
+    Token bucket po hostu. Pri prvom zahtevu prema hostu čita se robots.txt
+    (kroz prosleđenu get funkciju) i Crawl-delay ograničava maksimalni tempo.
+    """
+
+    def __init__(self, get, rate=DEFAULT_RATE, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE,
+                 user_agent='*'):
+        self._get = get
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.user_agent = user_agent
+        self._buckets = {}
+        self._host_locks = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        parts = urlsplit(url)
+        host = parts.netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is not None:
+                return bucket
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+
+        # Bucket se objavljuje tek sa primenjenim Crawl-delay-om; paralelni prvi zahtevi čekaju
+        with host_lock:
+            with self._lock:
+                bucket = self._buckets.get(host)
+            if bucket is not None:
+                return bucket
+            bucket = HostBucket(host, self.rate, self.min_rate, self.max_rate)
+            crawl_delay = self._crawl_delay(f"{parts.scheme}://{host}/robots.txt")
+            if crawl_delay:
+                bucket.limit_max_rate(1.0 / crawl_delay)
+                logging.info(f"[{host}] robots.txt Crawl-delay {crawl_delay}s → max {bucket.max_rate:.2f} zahteva/s")
+            with self._lock:
+                self._buckets[host] = bucket
+        return bucket
+
+    def _crawl_delay(self, robots_url):
+        try:
+            response = self._get(robots_url, timeout=10)
+            if response.status_code != 200:
+                return None
+            parser = RobotFileParser()
+            parser.parse(response.text.splitlines())
+            parser.modified()  # bez ovoga crawl_delay() vraća None
+            delay = parser.crawl_delay(self.user_agent)
+            return float(delay) if delay else None
+        except Exception as e:
+            logging.debug(f"robots.txt nije dostupan ({robots_url}): {e}")
+            return None
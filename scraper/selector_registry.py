@@ -0,0 +1,165 @@
+# selector_registry.py
+# Centralni registar CSS selektora za ekstraktore.
+# • Svaki selektor se kompajlira jednom (soupsieve.compile) i koristi ponovo za sve stranice
+# • first() / first_select(): lanac alternativnih selektora – vraća prvi pogodak, a za svaku
+#   alternativu beleži po brendu koliko puta je pokušana, koliko puta je pogodila i koliko je trajala
+# • Statistika se posle run-a spaja sa selector_stats.json (kumulativno kroz run-ove):
+#   alternative bez pogodaka su kandidati za brisanje, ostale se mogu poređati po pogocima
+# • Procesi parsera (parse_pool) vraćaju svoju statistiku uz zapis, pa se ništa ne gubi
+# • disable_stats(): alati koji puštaju ekstraktore van run-a (parity.py) ne beleže ništa
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+import soupsieve
+
+STATS_FILE = os.environ.get("SONUS_SELECTOR_STATS", "selector_stats.json")
+UNKNOWN_BRAND = "?"
+
+_compiled = {}
+_stats = {}  # brand -> lanac -> selektor -> [pokušaja, pogodaka, sekundi]
+_lock = threading.Lock()
+_context = threading.local()
+_recording = True
+
+
+def compile_selector(selector):
+    pattern = _compiled.get(selector)
+    if pattern is None:
+        pattern = _compiled[selector] = soupsieve.compile(selector)
+    return pattern
+
+
+class brand_context:
+    """with brand_context('polk'): – first()/select() bez brand argumenta beleže se pod ovim brendom."""
+
+    def __init__(self, brand):
+        self.brand = brand
+
+    def __enter__(self):
+        self.previous = getattr(_context, 'brand', None)
+        _context.brand = self.brand
+
+    def __exit__(self, *exc):
+        _context.brand = self.previous
+
+
+def disable_stats():
+    """Isključuje beleženje za ovaj proces (i čuvanje u STATS_FILE na izlasku)."""
+    global _recording
+    _recording = False
+
+
+def _record(brand, chain, selector, hit, seconds):
+    if not _recording:
+        return
+    brand = brand or getattr(_context, 'brand', None) or UNKNOWN_BRAND
+    with _lock:
+        entry = _stats.setdefault(brand, {}).setdefault(chain, {}).setdefault(selector, [0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += int(hit)
+        entry[2] += seconds
+
+
+def first(soup, chain, selectors, brand=None):
+    """Prvi element koji pogađa neki od selektora (redom); None ako nijedan ne pogađa."""
+    if isinstance(selectors, str):
+        selectors = (selectors,)
+    for selector in selectors:
+        pattern = compile_selector(selector)
+        started = time.perf_counter()
+        found = pattern.select_one(soup)
+        _record(brand, chain, selector, found is not None, time.perf_counter() - started)
+        if found is not None:
+            return found
+    return None
+
+
+def first_text(soup, chain, selectors, brand=None, strip=True):
+    el = first(soup, chain, selectors, brand)
+    return el.get_text(strip=strip) if el is not None else None
+
+
+def first_select(soup, chain, selectors, brand=None):
+    """Svi elementi prve alternative (redom) koja ima pogodaka; prazna lista ako nijedna nema."""
+    for selector in selectors:
+        found = select(soup, chain, selector, brand)
+        if found:
+            return found
+    return []
+
+
+def select(soup, chain, selector, brand=None):
+    """Svi elementi za selektor; pogodak je neprazan rezultat."""
+    pattern = compile_selector(selector)
+    started = time.perf_counter()
+    found = pattern.select(soup)
+    _record(brand, chain, selector, bool(found), time.perf_counter() - started)
+    return found
+
+
+def take_stats():
+    """Statistika od poslednjeg poziva (za slanje iz procesa parsera); lokalna se briše."""
+    global _stats
+    with _lock:
+        stats, _stats = _stats, {}
+    return stats
+
+
+def merge_stats(stats):
+    with _lock:
+        for brand, chains in stats.items():
+            for chain, selectors in chains.items():
+                for selector, (calls, hits, seconds) in selectors.items():
+                    entry = _stats.setdefault(brand, {}).setdefault(chain, {}).setdefault(selector, [0, 0, 0.0])
+                    entry[0] += calls
+                    entry[1] += hits
+                    entry[2] += seconds
+
+
+def log_summary(brand=None):
+    with _lock:
+        brands = {brand: _stats.get(brand, {})} if brand else dict(_stats)
+        for name, chains in brands.items():
+            for chain, selectors in chains.items():
+                for selector, (calls, hits, seconds) in selectors.items():
+                    logging.info(
+                        f"[{name}] selektor {chain}: {hits}/{calls} pogodaka, {seconds * 1000:.1f} ms – {selector}"
+                    )
+                    if calls and not hits:
+                        logging.debug(f"[{name}] {chain}: alternativa bez pogodaka – {selector}")
+
+
+def save(path=STATS_FILE):
+    """Spaja statistiku ovog run-a sa sačuvanom (zbir pokušaja, pogodaka i vremena)."""
+    stats = take_stats()
+    if not stats:
+        return
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    for brand, chains in stats.items():
+        for chain, selectors in chains.items():
+            for selector, (calls, hits, seconds) in selectors.items():
+                entry = saved.setdefault(brand, {}).setdefault(chain, {}).setdefault(
+                    selector, {"pokusaja": 0, "pogodaka": 0, "ms": 0.0}
+                )
+                entry["pokusaja"] += calls
+                entry["pogodaka"] += hits
+                entry["ms"] = round(entry["ms"] + seconds * 1000, 3)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.warning(f"Statistika selektora nije sačuvana ({path}): {e}")
+
+
+atexit.register(save)
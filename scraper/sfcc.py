@@ -0,0 +1,353 @@
+# sfcc.py
+# Adapter za Salesforce Commerce Cloud (demandware) prodavnice: Denon, Marantz,
+# Polk Audio i Bowers & Wilkins.
+# • Detalji proizvoda iz JSON kontrolera Product-Variation / Product-Show (format=ajax)
+#   umesto parsiranja renderovane HTML stranice od nekoliko stotina KB
+# • pid i dwvar_* parametri (izabrana boja) se čitaju iz URL-a proizvoda
+# • Varijante boja: master proizvod se preuzima jednom (master_url) i sve boje – swatch,
+#   slike i URL varijante – čitaju se iz variationAttributes; variant_key() spaja linkove
+#   iste grupe iz listinga u jedan zahtev i jedan zapis
+# • product_fields(): naziv, cena, opis, slike, specifikacije i boje iz JSON-a
+# • Ako JSON nije dostupan, load_fields() prelazi na HTML parser koji prosledi pozivalac;
+#   tagline (nije deo standardnog JSON-a) se zadržava iz postojećeg zapisa. HTML se parsira
+#   u parse_pool-u, pa load_fields() tada vraća fetcher.Deferred – pozivalac nastavlja
+#   kroz fetcher.then(), a Fetcher.run() dovršava zapis kada parsiranje završi
+# • parse_product_page(): zajednički HTML parser za Denon i Marantz (isti SFRA šablon)
+# • grid_links(): cela kategorija kroz Search-UpdateGrid (start/sz) u nekoliko zahteva,
+#   umesto samo prve stranice koju skraćuje lazy-loading "show more"
+# • --no-sfcc vraća stari režim (samo HTML)
+
+import logging
+import re
+import sys
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import SoupStrainer
+
+from fetcher import Deferred
+from parse_pool import submit
+from parsers import any_of, make_soup
+from selector_registry import first_text
+
+JSON_MODE = '--no-sfcc' not in sys.argv
+LOCALE = "en_US"
+CONTROLLERS = ("Product-Variation", "Product-Show")
+GRID_PAGE_SIZE = 120
+MAX_GRID_PAGES = 20
+SHOW_MORE_SELECTOR = '.show-more [data-url], button.more[data-url], [data-url*="Search-UpdateGrid"]'
+RESULT_COUNT_SELECTOR = '.result-count, .search-result-count, [data-result-count]'
+# Čvorovi mreže koje grid_links čita pored linkova proizvoda (broj rezultata, "show more")
+GRID_CONTROLS = any_of(
+    SoupStrainer(class_=re.compile(r'\b(result-count|search-result-count|show-more)\b')),
+    SoupStrainer(attrs={'data-url': True}),
+    SoupStrainer(attrs={'data-result-count': True}),
+)
+
+# Site ID-jevi iz demandware URL-ova logotipa sačuvanih u json/*.json
+SITE_IDS = {
+    "www.denon.com": "Sites-denon_us-Site",
+    "www.marantz.com": "Sites-marantz_us-Site",
+    "www.polkaudio.com": "Sites-polk_us-Site",
+    "www.bowerswilkins.com": "Sites-bowers_us-Site",
+}
+
+SITE_ID_RE = re.compile(r'/(Sites-[\w-]+?-Site)/')
+PID_RE = re.compile(r'/([^/?#]+)\.html')
+DWVAR_RE = re.compile(r'^dwvar_(.+)_[^_]+$')
+
+
+def site_id(product_url, logo_url=None):
+    host = urlsplit(product_url).netloc.lower()
+    if host in SITE_IDS:
+        return SITE_IDS[host]
+    m = SITE_ID_RE.search(logo_url or '')
+    return m.group(1) if m else None
+
+
+def pid_from_url(product_url):
+    m = PID_RE.search(urlsplit(product_url).path)
+    return m.group(1) if m else None
+
+
+def master_pid(product_url):
+    """pid master proizvoda: iz dwvar_<master>_<atribut> parametra, a bez njega iz putanje."""
+    for key, _ in parse_qsl(urlsplit(product_url).query):
+        m = DWVAR_RE.match(key)
+        if m:
+            return m.group(1)
+    return pid_from_url(product_url)
+
+
+def master_url(product_url):
+    """URL proizvoda bez izbora varijante – kontroler tada vraća sve vrednosti boja."""
+    return product_url.split('?')[0]
+
+
+def variant_key(product_url):
+    """Ključ grupe varijanti: linkovi različitih boja istog proizvoda imaju isti ključ."""
+    return master_pid(product_url) or master_url(product_url)
+
+
+def controller_url(product_url, controller, logo_url=None):
+    """URL JSON kontrolera za proizvod; dwvar_* parametri iz URL-a biraju varijantu."""
+    site = site_id(product_url, logo_url)
+    pid = pid_from_url(product_url)
+    if not site or not pid:
+        return None
+    parts = urlsplit(product_url)
+    params = [('pid', pid)]
+    params += [(k, v) for k, v in parse_qsl(parts.query) if k.startswith('dwvar_')]
+    params.append(('format', 'ajax'))
+    return f"{parts.scheme}://{parts.netloc}/on/demandware.store/{site}/{LOCALE}/{controller}?{urlencode(params)}"
+
+
+def category_from_url(product_url):
+    """'/en-us/product/av-receivers/...' → 'Av Receivers'."""
+    m = re.search(r'/product/([^/]+)/', product_url)
+    return m.group(1).replace('-', ' ').title() if m else None
+
+
+def _text(html):
+    if not html:
+        return None
+    return make_soup(html).get_text(' ', strip=True) or None
+
+
+def _image_url(image, base_url):
+    url = image.get('absURL') or image.get('url')
+    return urljoin(base_url, url) if url else None
+
+
+def _image_urls(images, base_url):
+    urls = []
+    for image in images or []:
+        url = _image_url(image, base_url)
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _variant_page_url(variation_url, base_url):
+    """Product-Variation URL vrednosti boje → stranica proizvoda sa istim dwvar_* izborom."""
+    if not variation_url:
+        return None
+    params = [(k, v) for k, v in parse_qsl(urlsplit(variation_url).query) if k.startswith('dwvar_')]
+    return f"{master_url(base_url)}?{urlencode(params)}" if params else master_url(base_url)
+
+
+def _price(price):
+    """SFRA cena: {'sales': {...}} ili raspon {'type': 'range', 'min': {...}, 'max': {...}}."""
+    if not price:
+        return None
+    if price.get('type') == 'range':
+        price = price.get('min') or {}
+    sales = price.get('sales') or price.get('list') or {}
+    return sales.get('formatted')
+
+
+def fetch_product(fetcher, product_url, timeout=15, conditional=False, logo_url=None):
+    """
+    Vraća (status, product) iz prvog kontrolera koji vrati JSON sa 'product' objektom.
+    product je None ako nijedan kontroler ne vrati JSON (pozivalac koristi HTML).
+    """
+    for controller in CONTROLLERS:
+        url = controller_url(product_url, controller, logo_url)
+        if url is None:
+            return None, None
+        try:
+            resp = fetcher.get(url, timeout=timeout, conditional=conditional)
+            if resp.status_code == 304:
+                return 304, None
+            resp.raise_for_status()
+            product = resp.json().get('product')
+        except ValueError:
+            # Product-Show sa format=ajax na nekim sajtovima vraća HTML (quick view)
+            continue
+        except Exception as e:
+            logging.debug(f"{controller} nije dostupan za {product_url}: {e}")
+            continue
+        if product:
+            return resp.status_code, product
+    return None, None
+
+
+def product_fields(product, base_url):
+    """Polja zapisa iz SFRA product JSON-a; vrednosti koje nedostaju su None / prazne liste."""
+    specs = {}
+    for group in product.get('attributes') or []:
+        for attr in group.get('attributes') or []:
+            value = attr.get('value')
+            if isinstance(value, list):
+                value = ', '.join(str(v) for v in value if v)
+            if attr.get('label') and value:
+                specs[attr['label'].strip().rstrip(':')] = str(value).strip()
+
+    colors = []
+    variants = []
+    for attribute in product.get('variationAttributes') or []:
+        if attribute.get('attributeId') != 'color':
+            continue
+        for value in attribute.get('values') or []:
+            value_images = value.get('images') or {}
+            swatch = (value_images.get('swatch') or [{}])[0]
+            colors.append({
+                "boja": value.get('displayValue'),
+                "url_uzorka": _image_url(swatch, base_url),
+            })
+            variants.append({
+                **colors[-1],
+                "url_proizvoda": _variant_page_url(value.get('url'), base_url),
+                "url_slika": _image_urls(value_images.get('large') or value_images.get('small'), base_url),
+                "dostupno": value.get('selectable'),
+            })
+
+    images = _image_urls((product.get('images') or {}).get('large'), base_url)
+
+    return {
+        "title": product.get('productName'),
+        "pid": product.get('id'),
+        "cena": _price(product.get('price')),
+        "opis": _text(product.get('shortDescription')) or _text(product.get('longDescription')),
+        "tagline": product.get('tagline') or product.get('productTagline'),
+        "images": images,
+        "specs": specs,
+        "category": None,
+        "colors": colors,
+        "variants": variants,
+        "available": product.get('available'),
+    }
+
+
+def parse_product_page(soup, base_url):
+    """HTML fallback za SFRA stranicu proizvoda (Denon / Marantz šablon), ista polja kao product_fields()."""
+    images = []
+    for img in soup.select('div.product-hero__image-wrapper img, picture img.img-fluid, .product-gallery-item img'):
+        src = img.get('src')
+        if src:
+            full = urljoin(base_url, src)
+            if full not in images:
+                images.append(full)
+
+    specs = {}
+    for row in soup.select('ul.specifications-list li, table.technical-specifications tbody tr'):
+        k = row.select_one('span.name, td:nth-child(1)')
+        v = row.select_one('span.value, td:nth-child(2)')
+        if k and v:
+            specs[k.get_text(strip=True)] = v.get_text(strip=True)
+
+    colors = []
+    for sw in soup.select('span.color-swatch'):
+        n = sw.select_one('.swatch-value')
+        i = sw.select_one('.color-value')
+        if n and i:
+            style = i.get('style', '')
+            img_url = ''
+            if 'background-image: url(' in style:
+                img_url = urljoin(base_url, style.split('url(')[1].split(')')[0].strip("'\""))
+            colors.append({"boja": n.get_text(strip=True), "url_uzorka": img_url})
+
+    pid_el = soup.select_one('[data-pid]')
+    return {
+        "title": first_text(soup, 'title', ['h1.product-hero__product-name', 'h1.product-name', 'h1.product-hero__title']),
+        "pid": pid_el.get('data-pid') if pid_el else None,
+        "cena": first_text(soup, 'price', ['div.price .value']),
+        "opis": first_text(soup, 'description', ['div.short-description p', 'div.product-hero__product-description p']),
+        "tagline": first_text(soup, 'tagline', ['p.product-tagline', 'div.product-tagline']),
+        "images": images,
+        "specs": specs,
+        "category": first_text(soup, 'category', ['ul.breadcrumb li:last-child a', 'nav[aria-label="breadcrumb"] li:last-child a']),
+        "colors": colors,
+        "variants": [],
+        "available": None,
+    }
+
+
+def load_fields(fetcher, product_url, html_parser=parse_product_page, timeout=15, known=None, logo_url=None):
+    """
+    Polja proizvoda iz JSON kontrolera, a ako JSON nije dostupan iz HTML stranice kroz
+    html_parser(soup, product_url) u parser procesu (parse_pool). Sa postojećim zapisom
+    (known) zahtev je uslovni, a tagline koji JSON ne sadrži se preuzima iz njega.
+    Vraća None za 304, a za HTML Deferred sa poljima.
+    """
+    conditional = known is not None
+    if JSON_MODE:
+        status, product = fetch_product(fetcher, product_url, timeout, conditional, logo_url)
+        if status == 304:
+            return None
+        if product:
+            fields = product_fields(product, product_url)
+            if not fields["tagline"] and known:
+                fields["tagline"] = (known.get("dodatne_informacije") or {}).get("tagline")
+            return fields
+        logging.info(f"SFCC JSON nije dostupan, parsiram HTML: {product_url}")
+
+    r = fetcher.get(product_url, timeout=timeout, conditional=conditional)
+    if r.status_code == 304:
+        return None
+    r.raise_for_status()
+    # Parsiranje u procesu parsera; nit se odmah vraća preuzimanju
+    return Deferred(submit(html_parser, r.text, product_url, fetcher.brand))
+
+
+def _with_params(url, **params):
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({k: str(v) for k, v in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def result_count(soup):
+    """Ukupan broj proizvoda u kategoriji ('124 Results'), ili None ako ga stranica ne navodi."""
+    el = soup.select_one(RESULT_COUNT_SELECTOR)
+    if not el:
+        return None
+    m = re.search(r'\d[\d,.]*', el.get('data-result-count') or el.get_text(' ', strip=True))
+    return int(re.sub(r'\D', '', m.group(0))) if m else None
+
+
+def grid_links(fetcher, category_url, extract_links, timeout=15, parse_only=None):
+    """
+    Svi linkovi proizvoda iz kategorije: prva stranica, pa Search-UpdateGrid sa velikim sz
+    dok se ne prikupi ukupan broj iz zaglavlja (ili dok stranica ne donese nove linkove).
+    start se pomera za broj linkova koje je stranica stvarno vratila, ne za traženi sz.
+    extract_links(soup, base_url) vraća linkove sa jedne stranice mreže; parse_only je
+    SoupStrainer za čvorove koje on čita (stranice se tada parsiraju delimično).
+    Vraća (links, total); kategorija sa manje prikupljenih od navedenih se loguje.
+    """
+    r = fetcher.get(category_url, timeout=timeout)
+    r.raise_for_status()
+    strainer = any_of(parse_only, GRID_CONTROLS) if parse_only is not None else None
+    soup = make_soup(r.text, fetcher.brand, parse_only=strainer)
+    links = list(dict.fromkeys(extract_links(soup, category_url)))
+    total = result_count(soup)
+
+    more = soup.select_one(SHOW_MORE_SELECTOR)
+    if more:
+        grid_url = urljoin(category_url, more['data-url'])
+        start = int(dict(parse_qsl(urlsplit(grid_url).query)).get('start') or len(links))
+    elif total and len(links) < total:
+        # Search-Show prihvata iste start/sz parametre kao Search-UpdateGrid
+        grid_url, start = category_url, len(links)
+    else:
+        grid_url = None
+
+    seen = set(links)
+    pages = 0
+    while grid_url and pages < MAX_GRID_PAGES and (total is None or len(links) < total):
+        r = fetcher.get(_with_params(grid_url, start=start, sz=GRID_PAGE_SIZE), timeout=timeout)
+        r.raise_for_status()
+        page = list(dict.fromkeys(extract_links(make_soup(r.text, fetcher.brand, parse_only=strainer), category_url)))
+        new = [l for l in page if l not in seen]
+        if not new:
+            break
+        links += new
+        seen.update(new)
+        # Server može da ograniči sz (24/48/60): sledeća stranica počinje posle onoga što je stiglo
+        start += len(page)
+        pages += 1
+
+    if total and len(links) < total:
+        logging.warning(f"NEPOTPUNA KATEGORIJA: {category_url} – prikupljeno {len(links)} od {total} proizvoda")
+    elif pages:
+        logging.info(f"Mreža kategorije: {len(links)} proizvoda u {pages + 1} zahteva ({category_url})")
+    return links, total
@@ -0,0 +1,139 @@
+# shopify.py
+# Zajedničke funkcije za Shopify prodavnice (Argon Audio, Q-Acoustics).
+# • Bulk režim: ceo katalog se čita kroz /products.json?limit=250&page=N u nekoliko
+#   zahteva, umesto posebnog <handle>.json zahteva za svaki proizvod
+# • product_fields(): naziv, opis, SKU, cena, slike i varijante iz JSON objekta proizvoda
+# • --no-bulk vraća stari režim (JSON po proizvodu)
+# • ProductSections: Section Rendering API (?sections=) – umesto cele stranice proizvoda
+#   preuzimaju se samo sekcije sa specifikacijama i swatch-evima; --no-sections isključuje
+
+import logging
+import re
+import sys
+from urllib.parse import urljoin
+
+from parsers import make_soup
+
+PAGE_LIMIT = 250  # Shopify maksimum po stranici
+MAX_PAGES = 100
+BULK_MODE = '--no-bulk' not in sys.argv
+SECTION_MODE = '--no-sections' not in sys.argv
+SECTION_PREFIX = 'shopify-section-'
+
+
+def format_price(price_str):
+    """'369.00' → '369,00 EUR' (isti format kao u postojećim JSON fajlovima)."""
+    if not price_str:
+        return None
+    try:
+        return f"{float(price_str):,.2f} EUR".replace(",", "X").replace(".", ",").replace("X", ".")
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_products(fetcher, products_json_url, timeout=30):
+    """Stranicu po stranicu vraća proizvode sa bilo kog products.json endpointa."""
+    base = products_json_url.split('?')[0]
+    for page in range(1, MAX_PAGES + 1):
+        resp = fetcher.get(f"{base}?limit={PAGE_LIMIT}&page={page}", timeout=timeout)
+        resp.raise_for_status()
+        products = resp.json().get('products', [])
+        yield from products
+        if len(products) < PAGE_LIMIT:
+            return
+    logging.warning(f"Dostignut limit od {MAX_PAGES} stranica za {products_json_url}")
+
+
+def load_catalogue(fetcher, main_url):
+    """Ceo katalog prodavnice: handle -> JSON objekat proizvoda."""
+    catalogue = {}
+    try:
+        for product in iter_products(fetcher, urljoin(main_url, '/products.json')):
+            if product.get('handle'):
+                catalogue[product['handle']] = product
+        logging.info(f"Bulk katalog: {len(catalogue)} proizvoda iz /products.json")
+    except Exception as e:
+        logging.error(f"Greška pri čitanju bulk kataloga ({main_url}): {e}")
+    return catalogue
+
+
+def handle_from_url(product_url):
+    return product_url.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+
+
+def product_fields(product):
+    """Polja zapisa koja JSON proizvoda sadrži; HTML je potreban samo za specifikacije i boje."""
+    variants = product.get('variants') or [{}]
+    return {
+        "title": product.get('title'),
+        "description": product.get('body_html') or '',
+        "sku": variants[0].get('sku'),
+        "cena": format_price(variants[0].get('price')),
+        "images": [img['src'].split('?')[0] for img in product.get('images', []) if img.get('src')],
+        "varijante": [
+            {
+                "naziv": v.get('title'),
+                "sku": v.get('sku'),
+                "cena": format_price(v.get('price')),
+                "dostupno": v.get('available'),
+            }
+            for v in product.get('variants', [])
+        ],
+    }
+
+
+class ProductSections:
+    """
+    HTML stranice proizvoda svedeno na sekcije koje sadrže zadate selektore.
+    ID-jevi sekcija se uče iz prve cele stranice (#shopify-section-<id> oko selektora), a
+    sledeći proizvodi se traže kao <url>?sections=<id>,... (JSON {id: html}). Ako neka
+    sekcija nedostaje (drugi šablon proizvoda), koristi se cela stranica i ID-jevi se uče ponovo.
+    """
+
+    def __init__(self, fetcher, selectors, full_page=None, timeout=15):
+        self.fetcher = fetcher
+        self.selectors = selectors
+        self.timeout = timeout
+        self.full_page = full_page or (lambda url: fetcher.get(url, timeout=timeout))
+        self.section_ids = None
+        self.section_pages = 0
+        self.full_pages = 0
+
+    def html(self, product_url):
+        section_ids = self.section_ids
+        if SECTION_MODE and section_ids:
+            base = product_url.split('?')[0]
+            try:
+                resp = self.fetcher.get(f"{base}?sections={','.join(section_ids)}", timeout=self.timeout)
+                resp.raise_for_status()
+                parts = resp.json()
+                if all(parts.get(section_id) for section_id in section_ids):
+                    self.section_pages += 1
+                    return ''.join(parts[section_id] for section_id in section_ids)
+                logging.info(f"Sekcije {section_ids} nedostaju za {product_url}, koristim celu stranicu")
+            except Exception as e:
+                logging.debug(f"Section Rendering greška za {product_url}: {e}")
+
+        resp = self.full_page(product_url)
+        resp.raise_for_status()
+        self.full_pages += 1
+        if SECTION_MODE:
+            self._learn(resp.text)
+        return resp.text
+
+    def _learn(self, html):
+        soup = make_soup(html, self.fetcher.brand)
+        section_ids = []
+        for selector in self.selectors:
+            el = soup.select_one(selector)
+            section = el.find_parent(id=re.compile('^' + SECTION_PREFIX)) if el else None
+            if section is not None:
+                section_id = section['id'][len(SECTION_PREFIX):]
+                if section_id not in section_ids:
+                    section_ids.append(section_id)
+        if section_ids and section_ids != self.section_ids:
+            logging.info(f"Section Rendering: sekcije proizvoda {section_ids}")
+            self.section_ids = section_ids
+
+    def log_summary(self):
+        logging.info(f"Section Rendering: {self.section_pages} proizvoda iz sekcija, {self.full_pages} celih stranica")
@@ -0,0 +1,191 @@
+# sitemap.py
+# Sitemap engine za inkrementalno otkrivanje proizvoda.
+# • XML se čita kroz ET.iterparse direktno iz mrežnog toka (i .xml.gz), element po element –
+#   ni telo ni stablo se ne drže cela u memoriji
+# • Sitemap se uvek preuzima sa servera (Fetcher.stream), nikad iz keša na disku
+# • Prati sitemap indekse i .xml.gz podmape
+# • SitemapState pamti najnoviji <lastmod> viđen u preuzetom sitemap-u (ne vreme run-a),
+#   pa changed_since() vraća samo URL-ove promenjene posle njega
+# • Promenjeni URL-ovi koje run nije uspeo da skrejpuje čuvaju se uz stanje i vraćaju
+#   se kao promenjeni u sledećem run-u; ako neka podmapa nije pročitana, granica se ne pomera
+# • --sitemap: Denon, Marantz, Polk i Bowers ponovo skrejpuju samo promenjene proizvode
+
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from xml.etree import ElementTree as ET
+
+SITEMAP_MODE = '--sitemap' in sys.argv
+STATE_DIR = os.environ.get("SONUS_HTTP_CACHE", ".http_cache")
+MAX_DEPTH = 3  # dubina ugnježdenih sitemap indeksa
+STREAM_CHUNK = 64 * 1024
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(value):
+    """W3C datetime ('2024-05-01', '2024-05-01T10:00:00+00:00', '...Z') -> aware datetime ili None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class _ChunkReader(io.RawIOBase):
+    """Fajl nad iteratorom delova tela (response.iter_content) za iterparse / GzipFile."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(target), len(self._buffer))
+        target[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def _open_body(chunks):
+    """Tok tela; .xml.gz (gzip magic) se raspakuje u prolazu."""
+    stream = io.BufferedReader(_ChunkReader(iter(chunks)), STREAM_CHUNK)
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def _iter_entries(stream):
+    """Vraća (vrsta, loc, lastmod) za svaki <url>/<sitemap> element, bez građenja celog stabla."""
+    loc = lastmod = None
+    for event, elem in ET.iterparse(stream, events=('end',)):
+        tag = _local(elem.tag)
+        if tag == 'loc':
+            loc = (elem.text or '').strip()
+        elif tag == 'lastmod':
+            lastmod = parse_lastmod(elem.text)
+        elif tag in ('url', 'sitemap'):
+            if loc:
+                yield tag, loc, lastmod
+            loc = lastmod = None
+            elem.clear()
+
+
+def iter_sitemap(fetcher, sitemap_url, url_filter=None, state=None, _depth=0):
+    """
+    Vraća (url, lastmod) za sve URL-ove iz sitemap-a, uključujući podmape iz indeksa.
+    Podmapa koja ne može da se preuzme se loguje i preskače (state.complete postaje False).
+    """
+    children = []
+    resp = fetcher.stream(sitemap_url, timeout=30)
+    try:
+        resp.raise_for_status()
+        for kind, loc, lastmod in _iter_entries(_open_body(resp.iter_content(STREAM_CHUNK))):
+            if kind == 'sitemap':
+                children.append(loc)  # podmape se otvaraju tek kada se ovaj tok zatvori
+            elif url_filter is None or url_filter(loc):
+                yield loc, lastmod
+    finally:
+        resp.close()
+
+    for loc in children:
+        if _depth >= MAX_DEPTH:
+            logging.warning(f"Preskačem preduboko ugnježden sitemap: {loc}")
+            continue
+        try:
+            yield from iter_sitemap(fetcher, loc, url_filter, state, _depth + 1)
+        except Exception as e:
+            logging.error(f"GREŠKA PRI PODMAPI {loc}: {e}")
+            if state is not None:
+                state.complete = False
+
+
+class SitemapState:
+    """Granica promena (najnoviji viđeni <lastmod>) i neuspeli promenjeni URL-ovi po brendu."""
+
+    def __init__(self, brand, directory=STATE_DIR):
+        self.path = os.path.join(directory, 'sitemap', f"{brand}.json")
+        self.started_at = datetime.now(timezone.utc)
+        self.last_run = None
+        self.pending = set()
+        self.newest = None  # najnoviji <lastmod> u ovom preuzimanju
+        self.complete = True  # False ako sitemap ili neka podmapa nije pročitana
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self.last_run = parse_lastmod(saved.get('last_run'))
+            self.pending = set(saved.get('pending', []))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def is_changed(self, lastmod):
+        if lastmod is not None and (self.newest is None or lastmod > self.newest):
+            self.newest = lastmod
+        # Bez prethodnog run-a ili bez <lastmod> ne znamo da je nepromenjen
+        if self.last_run is None or lastmod is None:
+            return True
+        return lastmod > self.last_run
+
+    def mark_success(self, failed=()):
+        """
+        Poziva se tek posle uspešnog čuvanja izlaza. failed – promenjeni URL-ovi koji nisu
+        skrejpovani; sledeći run ih ponovo tretira kao promenjene.
+        Granica se pomera na najnoviji <lastmod> iz preuzetog sitemap-a (bez <lastmod>
+        vrednosti – na početak run-a), i samo ako je sitemap pročitan ceo.
+        """
+        pending = set(failed)
+        last_run = self.last_run
+        if self.complete:
+            last_run = self.newest or self.started_at
+        else:
+            pending |= self.pending
+            logging.warning(f"SITEMAP nije pročitan ceo – granica promena ostaje {last_run}")
+        if pending:
+            logging.warning(f"SITEMAP: {len(pending)} promenjenih proizvoda nije skrejpovano – ponovo u sledećem run-u")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_run': last_run.isoformat() if last_run else None,
+                'pending': sorted(pending),
+            }, f)
+
+
+def changed_since(fetcher, brand, sitemap_url, url_filter=None):
+    """
+    Vraća (svi_urlovi, promenjeni_urlovi, state). URL-ovi su bez query parametara;
+    promenjeni uključuju i URL-ove koje prethodni run nije uspeo da skrejpuje.
+    Posle uspešnog čuvanja treba pozvati state.mark_success(neuspeli_promenjeni_urlovi).
+    """
+    state = SitemapState(brand)
+    all_urls = []
+    changed = set()
+    try:
+        for loc, lastmod in iter_sitemap(fetcher, sitemap_url, url_filter, state):
+            clean = loc.split('?')[0]
+            all_urls.append(clean)
+            if state.is_changed(lastmod) or clean in state.pending:
+                changed.add(clean)
+        since = state.last_run.isoformat() if state.last_run else "početka"
+        logging.info(f"SITEMAP {sitemap_url}: {len(all_urls)} URL-ova, promenjeno od {since}: {len(changed)}")
+    except Exception as e:
+        logging.error(f"GREŠKA PRI SITEMAP-U {sitemap_url}: {e}")
+        state.complete = False
+    return list(dict.fromkeys(all_urls)), changed, state
@@ -0,0 +1,418 @@
+# swatches.py
+# Uzorci boja (100×100) isečeni iz slike proizvoda.
+# • Traži se mala rendicija sa CDN-a (sw= za demandware, width= za Shopify) umesto originala
+# • PIL draft(): JPEG se dekodira u smanjenoj razmeri (1/2–1/8) kada je slika veća od potrebne
+# • Keš na disku po URL-u: isečen uzorak se čuva, pa naredni run ne preuzima sliku ponovo
+# • Više boja često koristi istu sliku (images[0]) – svaki URL se obrađuje jednom
+# • sample_many(): uzorci jednog proizvoda paralelno kroz thread pool
+# • SwatchAssets: uzorak se upisuje jednom kao mali WebP u direktorijum adresiran sadržajem
+#   (ime = SHA-256 bajtova), a url_uzorka pokazuje na fajl umesto base64 bloba u JSON-u;
+#   isti uzorak iz više proizvoda je jedan fajl. --inline-swatches vraća data URI
+# • Direktorijum uzoraka je <repo>/swatches bez obzira na radni direktorijum (relativan
+#   SONUS_SWATCH_ASSETS se takođe računa od korena repozitorijuma); javni URL fajlova je
+#   --swatch-base-url=<url> ili SONUS_SWATCH_BASE_URL i mora da pokazuje na isti direktorijum
+# • externalize(): data URI uzorci iz postojećih zapisa (JPEG i SVG fallback) prelaze u fajlove;
+#   skrejper ga pušta samo nad zapisima koji još sadrže INLINE_MARKER
+# • add_hex_colors(): hex boja za svaki uzorak svih brendova – slike se svode na mali
+#   centralni isečak i medijana po kanalu računa se za ceo skup jednim NumPy prolazom
+#   (providni pikseli se ne računaju); front-end može da prikaže boju bez zahteva za slikom
+# • Hex po izvoru uzorka se pamti u .swatch_cache/hex.json – i trajan neuspeh (slika bez
+#   piksela, neispravan format, 404), koji se ponovo pokušava tek posle HEX_RETRY_AFTER;
+#   prolazne greške preuzimanja (timeout, 5xx, 429, prekinuta veza) se ne pamte.
+#   Skrejperi ga pozivaju samo za nove i promenjene zapise
+# • SVG zamena bez prave boje (SVG_PLACEHOLDER u korenskom tagu) ne dobija hex
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+import requests
+from PIL import Image
+
+from http_cache import _write_atomic, normalize_url
+
+
+def _base_url_arg():
+    for arg in sys.argv:
+        if arg.startswith('--swatch-base-url='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SWATCH_CACHE_DIR = os.environ.get("SONUS_SWATCH_CACHE", ".swatch_cache")
+ASSET_DIR = os.path.join(REPO_ROOT, os.environ.get("SONUS_SWATCH_ASSETS", "swatches"))
+ASSET_BASE_URL = _base_url_arg() or os.environ.get(
+    "SONUS_SWATCH_BASE_URL", "https://raw.githubusercontent.com/MikiMix-Git/SonusArtBA/main/swatches/"
+)
+INLINE = '--inline-swatches' in sys.argv
+INLINE_MARKER = "data:image/"  # zapis sa ovim tekstom još ima inline uzorak
+DATA_URI_PREFIX = "data:image/jpeg;base64,"
+DATA_URI_RE = re.compile(r'^data:image/(jpeg|svg\+xml);base64,')
+RENDITION_WIDTH = 600  # širina slike sa CDN-a iz koje se seče uzorak
+BOX_SIZE = 100
+SWATCH_WORKERS = 4
+JPEG_QUALITY = 95
+WEBP_QUALITY = 80
+ANALYSIS_SIZE = 16  # stranica kvadrata piksela po uzorku za računanje boje
+ANALYSIS_REGION = 0.5  # udeo slike (centralni deo) iz kog se računa boja
+SVG_FILL_RE = re.compile(r'fill="(#[0-9a-fA-F]{6})"')
+SVG_PLACEHOLDER = 'data-placeholder="true"'  # atribut SVG zamene čija boja nije boja proizvoda
+PERMANENT_STATUSES = (404, 410)  # uzorak koji ne postoji; ostali statusi se ponovo pokušavaju
+TRANSIENT = object()  # load() u add_hex_colors: prolazna greška, rezultat se ne pamti
+HEX_CACHE_FILE = "hex.json"
+HEX_RETRY_AFTER = 7 * 24 * 3600  # izvor bez izračunate boje se ponovo pokušava posle nedelju dana
+
+
+def rendition_url(image_url, width=RENDITION_WIDTH):
+    """URL slike sa parametrom širine koji CDN razume; ostali URL-ovi se ne menjaju."""
+    parts = urlsplit(image_url)
+    if '/dw/image/' in parts.path or 'demandware' in parts.netloc:
+        param = 'sw'
+    elif 'cdn.shopify.com' in parts.netloc or '/cdn/shop/' in parts.path:
+        param = 'width'
+    else:
+        return image_url
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != param]
+    query.append((param, str(width)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def crop_sample(content, width=RENDITION_WIDTH, box_size=BOX_SIZE):
+    """Kvadrat box_size×box_size iz sredine desne trećine slike, kao JPEG bajtovi."""
+    img = Image.open(BytesIO(content))
+    # JPEG se dekodira direktno u manjoj razmeri ako CDN ipak vrati original
+    img.draft('RGB', (width, width))
+    img = img.convert("RGB")
+    w, h = img.size
+    left = w - (w // 3) + ((w // 3 - box_size) // 2)
+    top = (h - box_size) // 2
+    left = max(0, min(left, w - box_size))
+    top = max(0, min(top, h - box_size))
+    cropped = img.crop((left, top, left + box_size, top + box_size))
+    buf = BytesIO()
+    cropped.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buf.getvalue()
+
+
+def data_uri(jpeg):
+    return f"{DATA_URI_PREFIX}{base64.b64encode(jpeg).decode()}"
+
+
+class SwatchAssets:
+    """Direktorijum uzoraka adresiran sadržajem; put() vraća javni URL WebP fajla."""
+
+    def __init__(self, directory=ASSET_DIR, base_url=ASSET_BASE_URL):
+        self.directory = directory
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self._known = set()
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def put(self, jpeg):
+        buf = BytesIO()
+        Image.open(BytesIO(jpeg)).convert("RGB").save(buf, format="WEBP", quality=WEBP_QUALITY, method=6)
+        return self._put_file(buf.getvalue(), 'webp')
+
+    def _put_file(self, data, extension):
+        name = f"{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+        with self._lock:
+            known = name in self._known
+            self._known.add(name)
+        path = os.path.join(self.directory, name)
+        if not known and not os.path.exists(path):
+            _write_atomic(path, data)
+            self.written += 1
+        return self.base_url + name
+
+    def externalize(self, records):
+        """Inline uzorci iz zapisa (JPEG ili SVG data URI) prelaze u fajlove; vraća broj zamena."""
+        replaced = 0
+        for record in records:
+            for color in (record.get("dodatne_informacije") or {}).get("dostupne_boje") or []:
+                value = color.get("url_uzorka")
+                m = DATA_URI_RE.match(value) if isinstance(value, str) else None
+                if m:
+                    try:
+                        data = base64.b64decode(value[m.end():])
+                        color["url_uzorka"] = self.put(data) if m.group(1) == 'jpeg' else self._put_file(data, 'svg')
+                        replaced += 1
+                    except Exception as e:
+                        logging.warning(f"Inline uzorak za '{color.get('boja')}' nije prebačen u fajl: {e}")
+        return replaced
+
+    def files(self):
+        return len(self._known)
+
+
+class SwatchSampler:
+    """
+    Uzorci boja preko deljenog Fetcher-a (isti tempo i ograničenja po hostu kao stranice).
+    sample(url) vraća URL uzorka u assets (data URI uz --inline-swatches) ili None ako
+    slika nije dostupna.
+    """
+
+    def __init__(self, fetcher, width=RENDITION_WIDTH, directory=SWATCH_CACHE_DIR, workers=SWATCH_WORKERS,
+                 assets=None):
+        self.fetcher = fetcher
+        self.width = width
+        self.directory = directory
+        self.workers = workers
+        self.assets = None if INLINE else (assets or SwatchAssets())
+        self._samples = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.downloads = 0
+        self.cache_hits = 0
+
+    def _path(self, url):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.jpg")
+
+    def sample(self, image_url):
+        url = rendition_url(image_url, self.width)
+        with self._lock:
+            if url in self._samples:
+                return self._samples[url]
+            pending = self._pending.setdefault(url, threading.Lock())
+        # Paralelni zahtevi za isti URL čekaju prvi
+        with pending:
+            with self._lock:
+                if url in self._samples:
+                    return self._samples[url]
+            jpeg = self._load(url)
+            sample = self._output(jpeg) if jpeg else None
+            with self._lock:
+                self._samples[url] = sample
+                self._pending.pop(url, None)
+            return sample
+
+    def _load(self, url):
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                jpeg = f.read()
+            self.cache_hits += 1
+            return jpeg
+        except OSError:
+            pass
+
+        try:
+            resp = self.fetcher.get(url, timeout=12)
+            if resp.status_code != 200:
+                return None
+            self.downloads += 1
+            jpeg = crop_sample(resp.content, self.width)
+        except Exception as e:
+            logging.debug(f"Uzorak boje nije dostupan ({url}): {e}")
+            return None
+        try:
+            _write_atomic(path, jpeg)
+        except OSError as e:
+            logging.warning(f"Ne mogu da sačuvam uzorak boje {path}: {e}")
+        return jpeg
+
+    def _output(self, jpeg):
+        if self.assets is None:
+            return data_uri(jpeg)
+        try:
+            return self.assets.put(jpeg)
+        except Exception as e:
+            logging.warning(f"Uzorak nije upisan u {self.assets.directory}, ostaje inline: {e}")
+            return data_uri(jpeg)
+
+    def sample_many(self, image_urls):
+        """Uzorci za listu URL-ova istim redom; None za nedostupne (i za prazan URL)."""
+        unique = list(dict.fromkeys(u for u in image_urls if u))
+        if len(unique) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(unique)),
+                                    thread_name_prefix="swatch") as pool:
+                samples = dict(zip(unique, pool.map(self.sample, unique)))
+        else:
+            samples = {u: self.sample(u) for u in unique}
+        return [samples.get(u) if u else None for u in image_urls]
+
+    def log_summary(self):
+        logging.info(f"Uzorci boja: {len(self._samples)} slika, {self.downloads} preuzeto, {self.cache_hits} iz keša")
+        if self.assets is not None:
+            logging.info(f"Fajlovi uzoraka: {self.assets.files()} u {self.assets.directory} ({self.assets.written} novih)")
+
+
+def _color_sources(records):
+    """Parovi (boja dict, izvor uzorka) bez izračunate hex vrednosti (i boje varijanti)."""
+    for record in records:
+        info = record.get("dodatne_informacije") or {}
+        for color in (info.get("dostupne_boje") or []) + (info.get("varijante") or []):
+            source = color.get("url_uzorka") if isinstance(color, dict) else None
+            if source and isinstance(source, str) and not color.get("hex"):
+                yield color, source
+
+
+def _analysis_pixels(content):
+    """Centralni deo slike kao ANALYSIS_SIZE² × 4 (RGBA) niz."""
+    img = Image.open(BytesIO(content))
+    img.draft('RGB', (ANALYSIS_SIZE * 4, ANALYSIS_SIZE * 4))
+    img = img.convert("RGBA")
+    w, h = img.size
+    margin_x, margin_y = int(w * (1 - ANALYSIS_REGION) / 2), int(h * (1 - ANALYSIS_REGION) / 2)
+    img = img.crop((margin_x, margin_y, w - margin_x, h - margin_y))
+    img = img.resize((ANALYSIS_SIZE, ANALYSIS_SIZE), Image.BILINEAR)
+    return np.asarray(img, dtype=np.uint8).reshape(-1, 4)
+
+
+def median_hex(pixel_batch):
+    """
+    pixel_batch: N × P × 4 (RGBA) – medijana R, G, B po uzorku jednim prolazom kroz ceo skup.
+    Pikseli sa alfom < 128 se ne računaju; uzorak bez vidljivih piksela daje None.
+    """
+    rgb = pixel_batch[..., :3].astype(np.float32)
+    rgb[pixel_batch[..., 3] < 128] = np.nan
+    visible = ~np.isnan(rgb[..., 0]).all(axis=1)
+    medians = np.full((len(rgb), 3), np.nan, dtype=np.float32)
+    if visible.any():
+        medians[visible] = np.nanmedian(rgb[visible], axis=1)
+    return [
+        '#%02x%02x%02x' % tuple(int(round(c)) for c in m) if ok else None
+        for m, ok in zip(medians, visible)
+    ]
+
+
+class HexCache:
+    """Izračunat hex (ili neuspeh, None) po izvoru uzorka; ključ je SHA-256 izvora (data URI su dugi)."""
+
+    def __init__(self, directory=SWATCH_CACHE_DIR, retry_after=HEX_RETRY_AFTER):
+        self.path = os.path.join(directory, HEX_CACHE_FILE)
+        self.retry_after = retry_after
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+
+    @staticmethod
+    def _key(source):
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def lookup(self, source):
+        """(True, hex) za poznat rezultat – hex je None za skorašnji neuspeh; (False, None) ako treba računati."""
+        entry = self._data.get(self._key(source))
+        if not entry:
+            return False, None
+        value, checked_at = entry
+        if value is None and time.time() - checked_at >= self.retry_after:
+            return False, None
+        return True, value
+
+    def put(self, source, value):
+        self._data[self._key(source)] = [value, time.time()]
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            _write_atomic(self.path, json.dumps(self._data).encode('utf-8'))
+            self._dirty = False
+        except OSError as e:
+            logging.warning(f"Keš hex boja nije sačuvan ({self.path}): {e}")
+
+
+def add_hex_colors(fetcher, records, assets=None, workers=SWATCH_WORKERS, cache=None):
+    """
+    Dodaje "hex" svakoj boji (dostupne_boje i varijante) koja ima url_uzorka: slike sa
+    CDN-a preko fetcher-a, fajlovi iz SwatchAssets sa diska, data URI i SVG direktno.
+    Poziva se nad novim / ponovo skrejpovanim zapisima pre upisa u katalog. Izvori iz
+    HexCache-a se ne preuzimaju ponovo (ni oni koji skoro nisu trajno uspeli).
+    Vraća broj boja kojima je dodata vrednost.
+    """
+    assets = assets or SwatchAssets()
+    cache = cache or HexCache()
+    pending = {}
+    for color, source in _color_sources(records):
+        pending.setdefault(source, []).append(color)
+    if not pending:
+        return 0
+
+    hex_by_source = {}
+    known_failures = 0
+    for source in list(pending):
+        known, value = cache.lookup(source)
+        if known:
+            if value:
+                hex_by_source[source] = value
+            else:
+                known_failures += 1
+                del pending[source]
+
+    def load(source):
+        """Pikseli, SVG tekst, None (trajan neuspeh) ili TRANSIENT (pokušava se sledeći put)."""
+        try:
+            if source.startswith('data:'):
+                m = DATA_URI_RE.match(source)
+                data = base64.b64decode(source[m.end():]) if m else None
+                if m and m.group(1) == 'svg+xml':
+                    return data.decode('utf-8', 'replace')
+            elif source.startswith(assets.base_url):
+                with open(os.path.join(assets.directory, source[len(assets.base_url):]), 'rb') as f:
+                    data = f.read()
+                if source.endswith('.svg'):
+                    return data.decode('utf-8', 'replace')
+            else:
+                resp = fetcher.get(source, timeout=12)
+                if resp.status_code != 200:
+                    return None if resp.status_code in PERMANENT_STATUSES else TRANSIENT
+                data = resp.content
+            return _analysis_pixels(data) if data else None
+        except requests.RequestException as e:
+            logging.debug(f"Uzorak nije preuzet, pokušava se sledeći put ({source[:80]}): {e}")
+            return TRANSIENT
+        except Exception as e:
+            logging.debug(f"Boja uzorka nije izračunata ({source[:80]}): {e}")
+            return None
+
+    sources = [source for source in pending if source not in hex_by_source]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="swatch-hex") as pool:
+        loaded = list(pool.map(load, sources))
+
+    computed = {}
+    for source, value in zip(sources, loaded):
+        if isinstance(value, str):
+            m = SVG_FILL_RE.search(value) if SVG_PLACEHOLDER not in value else None
+            if m:
+                computed[source] = m.group(1).lower()
+    images = [(source, value) for source, value in zip(sources, loaded) if isinstance(value, np.ndarray)]
+    if images:
+        batch = np.stack([pixels for _, pixels in images])
+        computed.update(zip((source for source, _ in images), median_hex(batch)))
+    transient = 0
+    for source, value in zip(sources, loaded):
+        if value is TRANSIENT:
+            transient += 1
+            continue
+        cache.put(source, computed.get(source))
+    cache.save()
+    hex_by_source.update(computed)
+
+    added = 0
+    for source, colors in pending.items():
+        value = hex_by_source.get(source)
+        if value:
+            for color in colors:
+                color["hex"] = value
+                added += 1
+    logging.info(
+        f"Hex boje: {added} boja, izračunato {len([s for s in sources if computed.get(s)])} od {len(sources)} "
+        f"novih uzoraka, {known_failures} preskočeno (ranije bez rezultata), {transient} za ponovni pokušaj"
+    )
+    return added
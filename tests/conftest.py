@@ -0,0 +1,5 @@
+# Moduli skrejpera se uvoze kao u skriptama (radni direktorijum scraper/)
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scraper'))
@@ -0,0 +1,110 @@
+import io
+import re
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import fetcher
+from fetcher import STREAM_CHUNK, Fetcher
+from http_cache import ResponseCache, ValidatorStore
+
+URL = "https://www.example.com/products/speaker"
+# Isti oblik kao SPECIFICATION_END u scraperQ-Acoustics.py
+SPEC_END = (
+    re.compile(rb'<summary[^>]*>(?:(?!</summary>).)*?Specification', re.S),
+    re.compile(rb'</details>'),
+)
+SPEC_BLOCK = (b'<details><summary class="details__header">Specification</summary>'
+              + b'<li>Weight: 10 kg</li>' * 300 + b'</details>')
+
+
+def page(offset):
+    return b'x' * offset + SPEC_BLOCK + b'<script>tail</script>' * 10000
+
+
+def stream_response(body, etag='"v1"'):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = URL
+    response.headers = CaseInsensitiveDict({'ETag': etag})
+    response.raw = io.BytesIO(body)
+    return response
+
+
+@pytest.fixture
+def make_fetcher(tmp_path):
+    def make(body):
+        f = Fetcher("test")
+        f.cache = ResponseCache(directory=str(tmp_path))
+        f.validators = ValidatorStore("test", directory=str(tmp_path))
+        f.downloads = 0
+
+        def download(url, timeout=None, **kwargs):
+            f.downloads += 1
+            return stream_response(body)
+
+        f._download = download
+        return f
+    return make
+
+
+@pytest.mark.parametrize("offset", [100, STREAM_CHUNK - 1000, STREAM_CHUNK - 30, 3 * STREAM_CHUNK - 5])
+def test_read_until_finds_block_across_chunk_boundary(make_fetcher, offset):
+    body = page(offset)
+    f = make_fetcher(body)
+    response = f.get_until(URL, SPEC_END)
+    assert response.partial
+    assert response.content == body[:offset + len(SPEC_BLOCK)]
+
+
+def test_single_pattern_still_supported(make_fetcher):
+    body = page(STREAM_CHUNK - 4)
+    response = make_fetcher(body).get_until(URL, re.compile(rb'</details>'))
+    assert response.content.endswith(b'</details>') and response.partial
+
+
+def test_partial_body_is_cached_with_its_own_validators(make_fetcher, monkeypatch):
+    body = page(STREAM_CHUNK - 1000)
+    first = make_fetcher(body)
+    first.get_until(URL, SPEC_END)
+    first.validators.flush()
+
+    # Validatori skraćenog tela ne važe za celu stranicu
+    assert first.validators.headers_for(URL) == {}
+
+    monkeypatch.setattr(fetcher, 'CACHE_ONLY', True)
+    second = make_fetcher(body)
+    second.validators = first.validators
+    response = second.get_until(URL, SPEC_END)
+    assert second.downloads == 0
+    assert response.partial
+    assert response.content == body[:STREAM_CHUNK - 1000 + len(SPEC_BLOCK)]
+
+
+def test_partial_body_is_memoized(make_fetcher):
+    f = make_fetcher(page(100))
+    f.cache = None
+    f.get_until(URL, SPEC_END)
+    f.get_until(URL, SPEC_END)
+    assert f.downloads == 1 and f.memo_hits == 1
+
+
+def test_params_are_part_of_memo_key(make_fetcher):
+    f = make_fetcher(b'{"products": []}')
+    f.cache = None
+    f.get(URL, params={'page': 2})
+    f.get(URL, params={'page': 2})
+    f.get(URL, params={'page': 3})
+    assert f.downloads == 2 and f.memo_hits == 1
+
+
+def test_memo_keeps_every_page_of_a_run(make_fetcher):
+    f = make_fetcher(b'<html></html>')
+    f.cache = None
+    urls = [f"{URL}-{i}" for i in range(200)]
+    for url in urls:
+        f.get(url)
+    for url in urls:
+        f.get(url)
+    assert f.downloads == 200 and f.memo_hits == 200
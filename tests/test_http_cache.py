@@ -0,0 +1,35 @@
+import os
+import time
+
+import requests
+
+from http_cache import ResponseCache
+
+
+def response(body):
+    r = requests.Response()
+    r.status_code = 200
+    r._content = body
+    return r
+
+
+def meta_files(cache):
+    return [name for _, _, files in os.walk(os.path.join(cache.directory, 'meta')) for name in files]
+
+
+def test_evict_removes_meta_of_evicted_bodies(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path), max_bytes=10 ** 9)
+    cache.store("https://www.example.com/old", response(os.urandom(4000)))
+    old = time.time() - 3600
+    for root, _, files in os.walk(os.path.join(cache.directory, 'bodies')):
+        for name in files:
+            os.utime(os.path.join(root, name), (old, old))
+    cache.store("https://www.example.com/new", response(os.urandom(4000)))
+    assert len(meta_files(cache)) == 2
+
+    cache.max_bytes = 6000
+    cache.evict()
+
+    assert len(meta_files(cache)) == 1
+    assert cache.load("https://www.example.com/old") == (None, False)
+    assert cache.load("https://www.example.com/new")[0] is not None
@@ -0,0 +1,22 @@
+import multiprocessing
+import os
+import threading
+
+import parse_pool
+
+
+def die_in_worker(soup, url):
+    """Ruši proces parsera; u procesu skrejpera vraća ime niti koja je parsirala."""
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return threading.current_thread().name
+
+
+def test_broken_pool_reparses_on_fallback_thread():
+    try:
+        future = parse_pool.submit(die_in_worker, "<p>x</p>", "https://www.example.com/p")
+        assert future.result(timeout=60).startswith("parse-fallback")
+        assert parse_pool._broken
+    finally:
+        parse_pool.shutdown()
+        parse_pool._broken = False
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from rate_limit import RateLimiter
+
+
+class RobotsResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+
+def test_crawl_delay_above_min_rate_interval_is_respected():
+    limiter = RateLimiter(lambda url, timeout=None: RobotsResponse("User-agent: *\nCrawl-delay: 20\n"))
+    bucket = limiter.bucket("https://www.example.com/a")
+    assert bucket.max_rate == 1.0 / 20
+    assert bucket.rate <= 1.0 / 20
+    bucket.feedback(503, 0.1, retry_after=0)
+    assert bucket.rate <= 1.0 / 20
+
+
+def test_parallel_first_requests_wait_for_robots():
+    reads = []
+
+    def get(url, timeout=None):
+        reads.append(url)
+        time.sleep(0.1)
+        return RobotsResponse("User-agent: *\nCrawl-delay: 2\n")
+
+    limiter = RateLimiter(get)
+    buckets = []
+    threads = [threading.Thread(target=lambda: buckets.append(limiter.bucket("https://www.example.com/p")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(reads) == 1
+    assert len({id(b) for b in buckets}) == 1
+    assert all(b.max_rate == 0.5 for b in buckets)
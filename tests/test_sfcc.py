@@ -0,0 +1,65 @@
+from urllib.parse import parse_qsl, urlsplit
+
+import sfcc
+
+CATEGORY_URL = "https://www.example.com/en-us/category/speakers/"
+GRID_URL = "https://www.example.com/on/demandware.store/Sites-x-Site/en_US/Search-UpdateGrid?cgid=speakers"
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+class StubGrid:
+    """Search-UpdateGrid koji vraća najviše cap proizvoda po stranici, bez obzira na sz."""
+
+    brand = "test"
+
+    def __init__(self, total, first_page, cap, show_count=True):
+        self.total = total
+        self.show_count = show_count
+        self.first_page = first_page
+        self.cap = cap
+        self.requests = []
+
+    def tiles(self, start, count):
+        return ''.join(f'<a class="tile" href="/product/p{i}.html">p{i}</a>'
+                       for i in range(start, min(start + count, self.total)))
+
+    def get(self, url, timeout=None):
+        self.requests.append(url)
+        if url == CATEGORY_URL:
+            count = f'<div class="result-count">{self.total} Results</div>' if self.show_count else ''
+            return StubResponse(
+                f'{count}{self.tiles(0, self.first_page)}'
+                f'<div class="show-more"><button data-url="{GRID_URL}&start={self.first_page}&sz=12"></button></div>'
+            )
+        query = dict(parse_qsl(urlsplit(url).query))
+        return StubResponse(self.tiles(int(query['start']), min(int(query['sz']), self.cap)))
+
+
+def extract_links(soup, base_url):
+    return [a['href'] for a in soup.select('a.tile')]
+
+
+def test_grid_links_follows_capped_page_size():
+    grid = StubGrid(total=130, first_page=12, cap=24)
+    links, total = sfcc.grid_links(grid, CATEGORY_URL, extract_links)
+    assert total == 130
+    assert links == [f'/product/p{i}.html' for i in range(130)]
+    starts = [int(dict(parse_qsl(urlsplit(u).query))['start']) for u in grid.requests[1:]]
+    assert starts == list(range(12, 130, 24))
+
+
+def test_grid_links_stops_on_page_without_new_links():
+    grid = StubGrid(total=30, first_page=12, cap=24, show_count=False)
+    links, total = sfcc.grid_links(grid, CATEGORY_URL, extract_links)
+    assert total is None
+    assert links == [f'/product/p{i}.html' for i in range(30)]
+    # kategorija + stranica 12..29 + prazna stranica od 30
+    assert len(grid.requests) == 3